@@ -0,0 +1,249 @@
+"""Campaign throughput benchmark against a local in-process SMTP sink
+
+Runs the sequential (connection per message), pooled and concurrent senders
+against synthetic recipient lists and reports messages/sec, p50/p99
+per-message latency and peak RSS. Each run happens in a fresh process so the
+peak RSS figures are not polluted by earlier runs.
+
+    python benchmark.py --sizes 1000 10000 --latency 0.005 --error-rate 0.01
+"""
+import argparse
+import json
+import multiprocessing
+import queue as queue_module
+import random
+import resource
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+
+from message_template import CompiledTemplate
+from send_engine import AsyncSendEngine
+from smtp_pool import SMTPConnectionPool
+
+SENDER = 'bench@sender.example'
+MODES = ('sequential', 'pooled', 'concurrent')
+
+BODY = """
+<div style="font-family: Arial, sans-serif;">
+    <p>Hi ${firm_name},</p>
+    <p>This is a benchmark message.</p>
+</div>
+"""
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Minimal ESMTP dialogue: accept everything, optionally slowly or with 451s"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        self.reply('220 sink.local ESMTP benchmark sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.wfile.write(b'250-sink.local\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n')
+            elif command in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line == b'.\r\n':
+                        break
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.error_rate and random.random() < server.error_rate:
+                    self.reply('451 4.3.0 Injected temporary failure')
+                else:
+                    with server.lock:
+                        server.accepted += 1
+                    self.reply('250 OK queued')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Threaded SMTP server that discards messages, with latency/error injection"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0):
+        super().__init__((host, port), SinkHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.accepted = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def synthetic_recipients(count, domains):
+    return [
+        {'email': f'user{i}@domain{i % domains}.example', 'firm_name': f'Firm {i}'}
+        for i in range(count)
+    ]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_mode(mode, size, host, port, options):
+    """Send `size` messages with one sender implementation and measure it"""
+    template = CompiledTemplate.compile('Benchmark', SENDER, 'Hello ${firm_name}', BODY)
+    recipients = synthetic_recipients(size, options['domains'])
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+
+    if mode == 'sequential':
+        # The original behaviour: a fresh connection for every message
+        for recipient in recipients:
+            t0 = time.perf_counter()
+            try:
+                with smtplib.SMTP(host, port) as server:
+                    server.sendmail(SENDER, recipient['email'],
+                                    template.render(recipient['email'], recipient))
+            except smtplib.SMTPException:
+                failed += 1
+            latencies.append(time.perf_counter() - t0)
+        stats = {'sent': size - failed, 'failed': failed, 'retried': 0}
+
+    elif mode == 'pooled':
+        with SMTPConnectionPool(host, port, size=1, use_tls=False,
+                                max_messages_per_connection=options['per_connection']) as pool:
+            for recipient in recipients:
+                t0 = time.perf_counter()
+                try:
+                    pool.sendmail(SENDER, recipient['email'],
+                                  template.render(recipient['email'], recipient))
+                except smtplib.SMTPException:
+                    failed += 1
+                latencies.append(time.perf_counter() - t0)
+        stats = {'sent': size - failed, 'failed': failed, 'retried': 0}
+
+    else:
+        with SMTPConnectionPool(host, port, size=options['concurrency'], use_tls=False,
+                                max_messages_per_connection=options['per_connection']) as pool:
+            def send(recipient):
+                t0 = time.perf_counter()
+                try:
+                    pool.sendmail(SENDER, recipient['email'],
+                                  template.render(recipient['email'], recipient))
+                finally:
+                    latencies.append(time.perf_counter() - t0)
+
+            engine = AsyncSendEngine(
+                send,
+                concurrency=options['concurrency'],
+                default_domain_concurrency=options['domain_concurrency'],
+                backoff=0.01,
+                verbose=False,
+            )
+            stats = engine.send_all(recipients)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'size': size,
+        'sent': stats['sent'],
+        'failed': stats['failed'],
+        'retried': stats['retried'],
+        'elapsed': round(elapsed, 3),
+        'messages_per_sec': round(stats['sent'] / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        # ru_maxrss is reported in KiB on Linux and bytes on macOS
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+    }
+
+
+def _child(queue, mode, size, host, port, options):
+    queue.put(run_mode(mode, size, host, port, options))
+
+
+def wait_for_result(queue, process, poll=1.0):
+    """Return the child's result, or None once it has exited without one"""
+    while True:
+        try:
+            return queue.get(timeout=poll)
+        except queue_module.Empty:
+            if not process.is_alive():
+                try:
+                    return queue.get(timeout=poll)  # Put just before exiting
+                except queue_module.Empty:
+                    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark campaign send throughput')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--domain-concurrency', type=int, default=4)
+    parser.add_argument('--domains', type=int, default=50, help='Distinct recipient domains')
+    parser.add_argument('--per-connection', type=int, default=1000,
+                        help='Messages before a pooled connection is rotated')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Artificial server delay per message, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of messages answered with a 451')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    sink = SMTPSink(latency=args.latency, error_rate=args.error_rate).start()
+    host, port = sink.server_address
+    options = {
+        'concurrency': args.concurrency,
+        'domain_concurrency': args.domain_concurrency,
+        'domains': args.domains,
+        'per_connection': args.per_connection,
+    }
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    print(f"{'mode':<12}{'size':>8}{'sent':>8}{'failed':>8}{'msg/s':>10}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'rss MB':>9}")
+    for size in args.sizes:
+        for mode in args.modes:
+            queue = context.Queue()
+            process = context.Process(target=_child, args=(queue, mode, size, host, port, options))
+            process.start()
+            result = wait_for_result(queue, process)
+            process.join()
+            if result is None:
+                results.append({'mode': mode, 'size': size, 'failed_run': True,
+                                'exitcode': process.exitcode})
+                print(f"{mode:<12}{size:>8}  run failed (child exit code {process.exitcode})")
+                continue
+            results.append(result)
+            print(f"{mode:<12}{size:>8}{result['sent']:>8}{result['failed']:>8}"
+                  f"{result['messages_per_sec']:>10}{result['p50_ms']:>10}"
+                  f"{result['p99_ms']:>10}{result['peak_rss_mb']:>9}")
+
+    sink.shutdown()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import re
+import html
+from string import Template
+from email import policy
+from email.charset import Charset
+from email.header import Header
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from email.utils import formataddr
+
+# Placeholders use string.Template syntax: $name or ${name}
+PLACEHOLDER_PATTERN = Template.pattern
+SENTINEL_PATTERN = re.compile(rb'\x00(\d+)\x00')
+LINE_BREAK_PATTERN = re.compile(r'\r\n|\r|\n')
+
+# 8bit bodies keep placeholders intact through serialization (no base64/QP)
+UTF8_8BIT = Charset('utf-8')
+UTF8_8BIT.body_encoding = None
+
+
+def encode_header_value(name, value):
+    """Fold a header value at 78 columns, RFC 2047 encoded only when it is not plain ASCII
+
+    Line breaks in the value are collapsed to spaces so a substituted field
+    cannot start a header of its own.
+    """
+    value = ' '.join(LINE_BREAK_PATTERN.split(value.strip()))
+    try:
+        value.encode('ascii')
+        charset = 'us-ascii'
+    except UnicodeEncodeError:
+        charset = 'utf-8'
+    return Header(value, charset, maxlinelen=78, header_name=name).encode(linesep='\r\n')
+
+
+def normalize_line_endings(value):
+    """Bare CR or LF in a substituted body value becomes CRLF, as SMTP requires"""
+    return LINE_BREAK_PATTERN.sub('\r\n', value)
+
+
+class CompiledTemplate:
+    """A message serialized once, with placeholder slots spliced per recipient
+
+    The MIME structure, boundaries and invariant parts are encoded when the
+    template is compiled. Rendering only formats the per-recipient headers and
+    joins the precomputed byte segments with the substituted field values.
+    """
+
+    def __init__(self, from_header, subject, segments, slots, defaults):
+        self.from_header = from_header
+        self.subject = Template(subject)
+        self.subject_names = [
+            match.group('named') or match.group('braced')
+            for match in PLACEHOLDER_PATTERN.finditer(subject)
+            if match.group('named') or match.group('braced')
+        ]
+        self.segments = segments
+        self.slots = slots
+        self.defaults = defaults
+
+    @classmethod
+    def compile(cls, sender_name, sender_address, subject, html_body, defaults=None):
+        """Serialize the invariant parts of the message once"""
+        names = []
+
+        def mark(match):
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                # $$ escapes a literal dollar sign, anything else is left as-is
+                return '$' if match.group('escaped') is not None else match.group(0)
+            names.append(name)
+            return f'\x00{len(names) - 1}\x00'
+
+        marked_body = PLACEHOLDER_PATTERN.sub(mark, html_body)
+
+        msg = MIMEMultipart()
+        msg['From'] = formataddr((sender_name, sender_address))
+        part = MIMEText(marked_body, 'html', UTF8_8BIT)
+        # Substituted values may be non-ASCII even when the template is not
+        part.replace_header('Content-Transfer-Encoding', '8bit')
+        msg.attach(part)
+        serialized = msg.as_bytes(policy=policy.SMTP)
+
+        pieces = SENTINEL_PATTERN.split(serialized)
+        segments = pieces[0::2]
+        slots = [names[int(index)] for index in pieces[1::2]]
+        return cls(msg['From'], subject, segments, slots, dict(defaults or {}))
+
+    def field(self, fields, name):
+        value = fields.get(name)
+        if value is None or value == '':
+            value = self.defaults.get(name, '')
+        return str(value)
+
+    def render(self, to_email, fields=None, message_id=None):
+        """Return the full message bytes for one recipient
+
+        Raises ValueError if `to_email` holds a line break.
+        """
+        if LINE_BREAK_PATTERN.search(to_email):
+            raise ValueError(f'Line break in recipient address {to_email!r}')
+        fields = fields or {}
+        values = {name: self.field(fields, name) for name in self.slots}
+        subject = self.subject.safe_substitute(
+            {name: self.field(fields, name) for name in self.subject_names}
+        )
+        headers = (
+            f'To: {to_email}\r\n'
+            f'Subject: {encode_header_value("Subject", subject)}\r\n'
+        )
+        if message_id:
+            headers += f'Message-ID: {message_id}\r\n'
+        headers = headers.encode('ascii', 'replace')
+
+        parts = [headers, self.segments[0]]
+        for name, segment in zip(self.slots, self.segments[1:]):
+            parts.append(normalize_line_endings(html.escape(values[name])).encode('utf-8'))
+            parts.append(segment)
+        return b''.join(parts)
@@ -0,0 +1,141 @@
+import hashlib
+import sqlite3
+import time
+
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    campaign TEXT NOT NULL,
+    email TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_campaign_state ON outbox (campaign, state);
+"""
+
+UPSERT = """
+INSERT INTO outbox (idempotency_key, campaign, email, state, attempts, error, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (idempotency_key) DO UPDATE SET
+    state = excluded.state,
+    attempts = outbox.attempts + excluded.attempts,
+    error = excluded.error,
+    updated_at = excluded.updated_at
+"""
+
+
+def idempotency_key(campaign, email):
+    """Stable key for one (campaign, recipient) pair"""
+    return hashlib.sha256(f"{campaign}\x00{email.strip().lower()}".encode('utf-8')).hexdigest()
+
+
+class Outbox:
+    """Durable SQLite (WAL) journal of every recipient's delivery state
+
+    State changes are buffered and committed in batches, either every
+    `batch_size` changes or every `flush_interval` seconds, so the journal
+    never costs a disk sync per message. SENT marks are the exception: each
+    is committed at once (a WAL commit, without a sync under
+    synchronous=NORMAL), so a crashed run never re-sends a delivered message
+    on resume.
+    """
+
+    def __init__(self, path, campaign, batch_size=200, flush_interval=1.0):
+        self.path = path
+        self.campaign = campaign
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._buffer = []
+        self._buffered_states = {}
+        self._last_flush = time.monotonic()
+
+    def key(self, email):
+        return idempotency_key(self.campaign, email)
+
+    def state(self, email):
+        """Return the journaled state of a recipient, or None if never queued"""
+        key = self.key(email)
+        if key in self._buffered_states:
+            return self._buffered_states[key]
+        row = self.conn.execute(
+            'SELECT state FROM outbox WHERE idempotency_key = ?', (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def reset(self):
+        """Forget every recipient of this campaign (start a fresh run)"""
+        self.flush()
+        with self.conn:
+            self.conn.execute('DELETE FROM outbox WHERE campaign = ?', (self.campaign,))
+
+    def pending(self, recipients, address=lambda recipient: recipient):
+        """Queue recipients and yield only those not already sent"""
+        skipped = 0
+        for recipient in recipients:
+            email = address(recipient)
+            if self.state(email) == SENT:
+                skipped += 1
+                continue
+            self.record(email, QUEUED)
+            yield recipient
+        if skipped:
+            print(f"Resuming: skipped {skipped} recipients already sent")
+
+    def record(self, email, state, error=None, attempt=False):
+        key = self.key(email)
+        self._buffer.append(
+            (key, self.campaign, email, state, 1 if attempt else 0, error, time.time())
+        )
+        self._buffered_states[key] = state
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def mark_sending(self, email):
+        self.record(email, SENDING, attempt=True)
+
+    def mark_sent(self, email):
+        self.record(email, SENT)
+        self.flush()
+
+    def mark_failed(self, email, error):
+        self.record(email, FAILED, error=str(error))
+
+    def flush(self):
+        """Commit every buffered state change in one transaction"""
+        if self._buffer:
+            with self.conn:
+                self.conn.executemany(UPSERT, self._buffer)
+            self._buffer = []
+            self._buffered_states = {}
+        self._last_flush = time.monotonic()
+
+    def counts(self):
+        """Return the number of recipients per state for this campaign"""
+        self.flush()
+        rows = self.conn.execute(
+            'SELECT state, COUNT(*) FROM outbox WHERE campaign = ? GROUP BY state',
+            (self.campaign,)
+        )
+        return dict(rows.fetchall())
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
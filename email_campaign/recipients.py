@@ -0,0 +1,204 @@
+import csv
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import pandas as pd
+
+EMAIL_PATTERN = re.compile(r'^[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}$')
+EMAIL_COLUMNS = ('email', 'email_ids')
+
+
+def normalize_address(value):
+    """Return a lower-cased, trimmed address, or None if it is not an address"""
+    if not isinstance(value, str):
+        return None
+    email = value.strip().strip('<>').lower()
+    if email.startswith('mailto:'):
+        email = email[len('mailto:'):].split('?')[0]
+    if len(email) > 254 or not EMAIL_PATTERN.match(email):
+        return None
+    return email
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter; memory is set by capacity and error rate only"""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01, bits=None):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.positions(key))
+
+
+class DiskSet:
+    """Exact set of strings stored in SQLite, used behind a Bloom filter"""
+
+    def __init__(self, path, commit_every=10_000):
+        self.path = path
+        self.commit_every = commit_every
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA synchronous=OFF')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS keys (k TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._uncommitted = 0
+
+    def add(self, key):
+        self.conn.execute('INSERT OR IGNORE INTO keys (k) VALUES (?)', (key,))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def __contains__(self, key):
+        return self.conn.execute('SELECT 1 FROM keys WHERE k = ?', (key,)).fetchone() is not None
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class SeenAddresses:
+    """Memory-bounded dedupe: Bloom filter first, exact on-disk set on a maybe"""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01, path=None):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._tmpdir = None
+        if path is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix='recipients-')
+            path = os.path.join(self._tmpdir.name, 'seen.db')
+        self.exact = DiskSet(path)
+
+    def check_and_add(self, email):
+        """Return True if the address was already seen, recording it otherwise"""
+        if email in self.bloom and email in self.exact:
+            return True
+        self.bloom.add(email)
+        self.exact.add(email)
+        return False
+
+    def close(self):
+        self.exact.close()
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+
+
+class SuppressionList:
+    """Unsubscribe/suppression addresses, indexed once into SQLite
+
+    The index (exact set plus a persisted Bloom filter) lives next to the
+    source file and is only rebuilt when the source file changes.
+    """
+
+    def __init__(self, source_path, index_path=None, capacity=1_000_000, error_rate=0.01):
+        self.source_path = source_path
+        self.index_path = index_path or f"{source_path}.idx"
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v);
+            CREATE TABLE IF NOT EXISTS suppressed (email TEXT PRIMARY KEY) WITHOUT ROWID;
+        """)
+        self.bloom = self.load_or_build()
+
+    def source_signature(self):
+        stat = os.stat(self.source_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load_or_build(self):
+        meta = dict(self.conn.execute('SELECT k, v FROM meta').fetchall())
+        signature = self.source_signature()
+        if meta.get('signature') == signature and meta.get('bloom') is not None:
+            bloom = BloomFilter(self.capacity, self.error_rate, bytearray(meta['bloom']))
+            if len(bloom.bits) == (bloom.size + 7) // 8:
+                return bloom
+        return self.build(signature)
+
+    def build(self, signature):
+        """Stream the source file into the index"""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        count = 0
+        with self.conn:
+            self.conn.execute('DELETE FROM suppressed')
+            with open(self.source_path, newline='', encoding='utf-8', errors='replace') as f:
+                batch = []
+                for row in csv.reader(f):
+                    email = normalize_address(row[0]) if row else None
+                    if email is None:
+                        continue
+                    bloom.add(email)
+                    batch.append((email,))
+                    if len(batch) >= 10_000:
+                        self.conn.executemany('INSERT OR IGNORE INTO suppressed VALUES (?)', batch)
+                        count += len(batch)
+                        batch = []
+                self.conn.executemany('INSERT OR IGNORE INTO suppressed VALUES (?)', batch)
+                count += len(batch)
+            self.conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [
+                ('signature', signature),
+                ('bloom', bytes(bloom.bits)),
+            ])
+        print(f"Indexed {count} suppressed addresses from {self.source_path}")
+        return bloom
+
+    def __contains__(self, email):
+        if email not in self.bloom:
+            return False
+        return self.conn.execute(
+            'SELECT 1 FROM suppressed WHERE email = ?', (email,)
+        ).fetchone() is not None
+
+    def close(self):
+        self.conn.close()
+
+
+def stream_recipients(file_path, suppression=None, chunk_size=10_000, stats=None):
+    """Yield normalized, deduplicated, non-suppressed recipient rows
+
+    Reads `file_path` in chunks of `chunk_size` rows, so memory stays flat
+    regardless of list size. Accepts both the basic (`email_ids`) and the VC
+    (`email`, `firm_name`, ...) schemas; every row is yielded with an `email` key.
+    """
+    stats = stats if stats is not None else {}
+    for key in ('rows', 'invalid', 'duplicates', 'suppressed', 'recipients'):
+        stats.setdefault(key, 0)
+
+    seen = SeenAddresses()
+    try:
+        for chunk in pd.read_csv(file_path, dtype=str, chunksize=chunk_size):
+            column = next((c for c in EMAIL_COLUMNS if c in chunk.columns), None)
+            if column is None:
+                raise ValueError(f"{file_path} has no email column (expected one of {EMAIL_COLUMNS})")
+            chunk = chunk.fillna('')
+            for row in chunk.to_dict('records'):
+                stats['rows'] += 1
+                email = normalize_address(row.pop(column))
+                if email is None:
+                    stats['invalid'] += 1
+                    continue
+                if seen.check_and_add(email):
+                    stats['duplicates'] += 1
+                    continue
+                if suppression is not None and email in suppression:
+                    stats['suppressed'] += 1
+                    continue
+                row['email'] = email
+                stats['recipients'] += 1
+                yield row
+    finally:
+        seen.close()
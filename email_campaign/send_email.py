@@ -1,8 +1,14 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import pandas as pd
 import os
+import argparse
+from smtp_pool import SMTPConnectionPool
+from send_engine import AsyncSendEngine
+from message_template import CompiledTemplate
+from outbox import SENT, Outbox
+from recipients import SuppressionList, stream_recipients
+from verify_emails import EmailVerifier
 
 # SMTP Configuration
 SMTP_SERVER = 'Add outgoing server'
@@ -11,37 +17,75 @@ EMAIL_ADDRESS = 'Add your email'
 EMAIL_PASSWORD = 'add your password here'
 SENDER_NAME = 'Test Email programs'
 
-# Email sending function
-def send_email(to_email, subject, body):
+# Connection pool configuration
+POOL_SIZE = 4  # Number of authenticated SMTP sessions kept open
+MESSAGES_PER_CONNECTION = 100  # Reconnect a session after this many messages
+
+# Rate limiting configuration (messages per second)
+DOMAIN_RATES = {
+    'gmail.com': 5,
+    'googlemail.com': 5,
+    'outlook.com': 3,
+    'hotmail.com': 3,
+    'yahoo.com': 3,
+}
+DEFAULT_DOMAIN_RATE = 2  # Applies to every other (e.g. corporate) domain
+
+# Messages in flight at once per recipient domain (each domain is its own delivery lane)
+DOMAIN_CONCURRENCY = {
+    'gmail.com': 4,
+    'googlemail.com': 4,
+}
+DEFAULT_DOMAIN_CONCURRENCY = 2
+MAX_RETRIES = 3  # Retries for 4xx (temporary) SMTP replies
+
+# Durable journal of who was already sent to (used by --resume)
+OUTBOX_FILE = os.path.join('..', 'common_data', 'outbox.db')
+
+# Unsubscribed/suppressed addresses, one per line (first CSV column); optional
+SUPPRESSION_FILE = os.path.join('..', 'common_data', 'suppression.csv')
+
+# Build the serialized message for one recipient
+def build_message(to_email, subject, body):
     msg = MIMEMultipart()
     msg['From'] = f'{SENDER_NAME} <{EMAIL_ADDRESS}>'
     msg['To'] = to_email
     msg['Subject'] = subject
 
     msg.attach(MIMEText(body, 'html'))
+    return msg.as_string()
+
+# Email sending function
+def send_email(to_email, subject, body, pool=None):
+    message = build_message(to_email, subject, body)
 
     try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.sendmail(EMAIL_ADDRESS, to_email, msg.as_string())
-            print(f"Email sent to {to_email}")
+        if pool is not None:
+            pool.sendmail(EMAIL_ADDRESS, to_email, message)
+        else:
+            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+                server.starttls()
+                server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+                server.sendmail(EMAIL_ADDRESS, to_email, message)
+        print(f"Email sent to {to_email}")
     except Exception as e:
         print(f"Failed to send email to {to_email}. Error: {e}")
 
-# Load emails from CSV in the external folder
-def load_emails_from_csv(file_path):
+# Stream recipients from CSV in the external folder
+# Works with both emails.csv (email_ids) and vc_investors_emails.csv (email, firm_name, ...)
+def load_recipients_from_csv(file_path, suppression=None, stats=None):
+    stats = stats if stats is not None else {}
     if os.path.exists(file_path):
-        df = pd.read_csv(file_path)
-        return df['email_ids'].tolist()
+        return stream_recipients(file_path, suppression, stats=stats)
     else:
         print(f"Error: The file {file_path} does not exist.")
-        return []
+        stats.update(rows=0, invalid=0, duplicates=0, suppressed=0, recipients=0)
+        return iter(())
 
 # Email body content
 email_body = """
 <div style="background-color: #f8f9fa; padding: 20px; font-family: Arial, sans-serif; color: #333;">
-    <p>Hi,</p>
+    <p>Hi ${firm_name},</p>
 
     <p>Looking to empower your email?</p>
 
@@ -53,22 +97,105 @@ email_body = """
 </div>
 """
 
+# Fallback values for placeholders missing from a recipient's row
+template_defaults = {
+    'firm_name': 'there',
+    'additional_info': '',
+}
+
 # Main function to send emails
 def main():
-    # Define the path to the external emails.csv file
+    parser = argparse.ArgumentParser(description='Send the email campaign')
+    parser.add_argument('--concurrency', type=int, default=POOL_SIZE,
+                        help='Number of messages in flight at once')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Global send rate limit in messages per second')
+    parser.add_argument('--file', default='emails.csv',
+                        help='Recipient CSV in common_data (e.g. vc_investors_emails.csv)')
+    parser.add_argument('--campaign', default=None,
+                        help='Campaign name used for idempotency keys (defaults to the subject)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip recipients already sent by a previous run of this campaign')
+    parser.add_argument('--restart', action='store_true',
+                        help='Forget a previous run of this campaign and send to everyone again')
+    parser.add_argument('--no-verify', action='store_true',
+                        help='Skip MX/disposable/role-account verification of recipients')
+    args = parser.parse_args()
+
+    # Define the path to the external recipients file
     external_folder = os.path.join('..', 'common_data')  # Adjust this path if needed
-    emails_file = os.path.join(external_folder, 'emails.csv')
+    emails_file = os.path.join(external_folder, args.file)
+
+    if not os.path.exists(emails_file):
+        print(f"Error: The file {emails_file} does not exist.")
+        print("No emails to send.")
+        return
+
+    # Stream the recipients from the external CSV file, dropping duplicates
+    # and anything on the suppression list
+    suppression = SuppressionList(SUPPRESSION_FILE) if os.path.exists(SUPPRESSION_FILE) else None
+    load_stats = {}
+    recipients = load_recipients_from_csv(emails_file, suppression, load_stats)
+
+    # Drop addresses whose domain cannot receive mail before they take an SMTP slot
+    verifier = None
+    if not args.no_verify:
+        verifier = EmailVerifier()
+        recipients = verifier.filter(recipients, lambda recipient: recipient['email'])
+
+    # Update the subject to the desired format
+    subject = 'Test email'
+
+    # Encode the invariant MIME parts once, substitute per recipient
+    template = CompiledTemplate.compile(SENDER_NAME, EMAIL_ADDRESS, subject, email_body,
+                                        template_defaults)
+
+    sender_domain = EMAIL_ADDRESS.rsplit('@', 1)[-1]
+
+    # Send emails concurrently over a pool of reused SMTP sessions,
+    # journaling every recipient so an interrupted run can be resumed
+    with Outbox(OUTBOX_FILE, args.campaign or subject) as outbox, \
+            SMTPConnectionPool(SMTP_SERVER, SMTP_PORT, EMAIL_ADDRESS, EMAIL_PASSWORD,
+                               size=args.concurrency,
+                               max_messages_per_connection=MESSAGES_PER_CONNECTION) as pool:
+        if not args.resume:
+            already_sent = outbox.counts().get(SENT, 0)
+            if already_sent and not args.restart:
+                print(f"Campaign '{outbox.campaign}' already sent {already_sent} emails. "
+                      f"Use --resume to continue it or --restart to send to everyone again.")
+                return
+            outbox.reset()
 
-    # Load the emails from the external CSV file
-    email_list = load_emails_from_csv(emails_file)
+        def send(recipient):
+            message_id = f"<{outbox.key(recipient['email'])[:32]}@{sender_domain}>"
+            message = template.render(recipient['email'], recipient, message_id)
+            pool.sendmail(EMAIL_ADDRESS, recipient['email'], message)
 
-    if email_list:
-        # Update the subject to the desired format
-        subject = 'Test email'
+        engine = AsyncSendEngine(
+            send,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            domain_rates=DOMAIN_RATES,
+            default_domain_rate=DEFAULT_DOMAIN_RATE,
+            domain_concurrency=DOMAIN_CONCURRENCY,
+            default_domain_concurrency=DEFAULT_DOMAIN_CONCURRENCY,
+            max_retries=MAX_RETRIES,
+            journal=outbox,
+        )
+        stats = engine.send_all(outbox.pending(recipients, lambda recipient: recipient['email']))
+        pool.report()
+        print(f"Outbox: {outbox.counts()}")
+    if suppression is not None:
+        suppression.close()
 
-        # Send emails
-        for email in email_list:
-            send_email(email, subject, email_body)
+    print(f"Loaded {load_stats['recipients']} recipients from {load_stats['rows']} rows "
+          f"({load_stats['duplicates']} duplicates, {load_stats['suppressed']} suppressed, "
+          f"{load_stats['invalid']} invalid)")
+    if verifier is not None:
+        print(f"Verification: {verifier.stats}")
+    if stats['sent'] or stats['failed']:
+        print(f"Sent {stats['sent']}, failed {stats['failed']}, retried {stats['retried']} "
+              f"in {stats['elapsed']:.1f}s")
     else:
         print("No emails to send.")
 
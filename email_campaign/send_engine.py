@@ -0,0 +1,263 @@
+import asyncio
+import random
+import smtplib
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Replies that mean "this domain wants us to slow down"
+DEFERRAL_CODES = {421, 450, 451, 452}
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` acquisitions per second"""
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            delay = self.wait_time(time.monotonic())
+            if not delay:
+                self.take()
+                return
+            await asyncio.sleep(delay)
+
+
+def smtp_reply_code(error):
+    """Return the SMTP reply code carried by an smtplib exception, if any"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return min(codes) if codes else None
+    return getattr(error, 'smtp_code', None)
+
+
+def is_transient(error):
+    """4xx replies and dropped connections are worth retrying, 5xx are not"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return True
+    code = smtp_reply_code(error)
+    return code is not None and 400 <= code < 500
+
+
+def recipient_address(recipient):
+    """Recipients are either plain addresses or CSV rows with an 'email' field"""
+    return recipient['email'] if isinstance(recipient, dict) else recipient
+
+
+def recipient_domain(email):
+    return email.rsplit('@', 1)[-1].lower()
+
+
+class DomainLane:
+    """Recipients for one domain, with their own concurrency cap, rate and backoff"""
+
+    def __init__(self, domain, concurrency, rate=None):
+        self.domain = domain
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate) if rate else None
+        self.pending = deque()
+        self.in_flight = 0
+        self.backoff_until = 0.0
+        self.deferrals = 0
+        self.scheduled = False
+
+    def wait_time(self, now):
+        """Seconds until this lane may dispatch, or None while it is at its cap"""
+        if not self.pending or self.in_flight >= self.concurrency:
+            return None
+        wait = max(0.0, self.backoff_until - now)
+        if not wait and self.bucket is not None:
+            wait = self.bucket.wait_time(now)
+        return wait
+
+    def defer(self, base_delay):
+        """Back off this lane only, longer for each consecutive deferral"""
+        self.deferrals += 1
+        delay = base_delay * (2 ** min(self.deferrals - 1, 6)) * random.uniform(0.5, 1.5)
+        self.backoff_until = max(self.backoff_until, time.monotonic() + delay)
+        return delay
+
+    def succeeded(self):
+        self.deferrals = 0
+
+
+class AsyncSendEngine:
+    """Send messages concurrently, sharded into per-domain delivery lanes
+
+    Recipients are queued by domain and lanes are drained round-robin, each
+    under its own concurrency cap, token bucket and backoff. A domain that
+    defers us (421/451) only slows its own lane; the others keep sending.
+    The blocking `send` callable (usually backed by an SMTPConnectionPool)
+    runs on a thread pool so that `concurrency` messages are in flight at once.
+    If a `journal` (an Outbox) is given, every state change is recorded in it.
+    Per-message output can be silenced with `verbose=False`.
+    """
+
+    def __init__(self, send, concurrency=4, rate=None, domain_rates=None,
+                 default_domain_rate=None, max_retries=3, backoff=2.0, journal=None,
+                 domain_concurrency=None, default_domain_concurrency=2, max_buffered=10000,
+                 verbose=True):
+        self.send = send
+        self.verbose = verbose
+        self.journal = journal
+        self.concurrency = concurrency
+        self.rate = rate
+        self.domain_rates = {domain.lower(): r for domain, r in (domain_rates or {}).items()}
+        self.default_domain_rate = default_domain_rate
+        self.domain_concurrency = {domain.lower(): c for domain, c in (domain_concurrency or {}).items()}
+        self.default_domain_concurrency = default_domain_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_buffered = max_buffered
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0, 'elapsed': 0.0}
+        self.lanes = {}
+
+    def lane(self, domain):
+        """Return the delivery lane for a recipient domain, creating it lazily"""
+        if domain not in self.lanes:
+            self.lanes[domain] = DomainLane(
+                domain,
+                self.domain_concurrency.get(domain, self.default_domain_concurrency),
+                self.domain_rates.get(domain, self.default_domain_rate),
+            )
+        return self.lanes[domain]
+
+    async def attempt(self, loop, executor, lane, recipient, attempts):
+        """Send one message once and return the outcome instead of raising"""
+        try:
+            await loop.run_in_executor(executor, self.send, recipient)
+            return lane, recipient, attempts, None
+        except Exception as e:
+            return lane, recipient, attempts, e
+
+    def finish(self, lane, recipient, attempts, error):
+        """Record an attempt's outcome; returns True if the recipient was requeued"""
+        lane.in_flight -= 1
+        email = recipient_address(recipient)
+        if error is None:
+            lane.succeeded()
+            self.stats['sent'] += 1
+            if self.journal is not None:
+                self.journal.mark_sent(email)
+            if self.verbose:
+                print(f"Email sent to {email}")
+            return False
+        if attempts < self.max_retries and is_transient(error):
+            self.stats['retried'] += 1
+            delay = lane.defer(self.backoff)
+            lane.pending.appendleft((recipient, attempts + 1))
+            if self.verbose:
+                print(f"Deferred sending to {email} ({error}). Retrying in {delay:.1f}s")
+            return True
+        self.stats['failed'] += 1
+        if self.journal is not None:
+            self.journal.mark_failed(email, error)
+        if self.verbose:
+            print(f"Failed to send email to {email}. Error: {error}")
+        return False
+
+    async def run(self, recipients):
+        """Send to every recipient and return the run statistics"""
+        global_bucket = TokenBucket(self.rate) if self.rate else None
+        loop = asyncio.get_running_loop()
+        source = iter(recipients)
+        exhausted = False
+        buffered = 0
+        tasks = set()
+        ring = deque()
+        start = time.perf_counter()
+
+        def schedule(lane):
+            if not lane.scheduled:
+                lane.scheduled = True
+                ring.append(lane)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                # Read ahead so small domains further down the list get their
+                # own lanes instead of waiting behind a throttled big one
+                while not exhausted and buffered < self.max_buffered:
+                    try:
+                        recipient = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    lane = self.lane(recipient_domain(recipient_address(recipient)))
+                    lane.pending.append((recipient, 0))
+                    schedule(lane)
+                    buffered += 1
+
+                # Round-robin over lanes, at most one dispatch per lane per pass
+                next_wake = None
+                progressed = True
+                while progressed and len(tasks) < self.concurrency:
+                    progressed = False
+                    for _ in range(len(ring)):
+                        if len(tasks) >= self.concurrency:
+                            break
+                        lane = ring.popleft()
+                        if not lane.pending:
+                            lane.scheduled = False
+                            continue
+                        ring.append(lane)
+                        now = time.monotonic()
+                        wait = lane.wait_time(now)
+                        if wait is None:
+                            continue
+                        if not wait and global_bucket is not None:
+                            wait = global_bucket.wait_time(now)
+                        if wait:
+                            next_wake = wait if next_wake is None else min(next_wake, wait)
+                            continue
+                        if lane.bucket is not None:
+                            lane.bucket.take()
+                        if global_bucket is not None:
+                            global_bucket.take()
+                        recipient, attempts = lane.pending.popleft()
+                        buffered -= 1
+                        lane.in_flight += 1
+                        if self.journal is not None:
+                            self.journal.mark_sending(recipient_address(recipient))
+                        tasks.add(asyncio.create_task(
+                            self.attempt(loop, executor, lane, recipient, attempts)))
+                        progressed = True
+
+                if not tasks and not buffered and exhausted:
+                    break
+                if tasks:
+                    done, tasks = await asyncio.wait(
+                        tasks, timeout=next_wake, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    # Everything buffered is waiting on a backoff or rate limit
+                    await asyncio.sleep(next_wake or 0)
+                    done = set()
+
+                for task in done:
+                    lane, recipient, attempts, error = task.result()
+                    if self.finish(lane, recipient, attempts, error):
+                        buffered += 1
+                        schedule(lane)
+
+        self.stats['elapsed'] = time.perf_counter() - start
+        self.stats['lanes'] = len(self.lanes)
+        return self.stats
+
+    def send_all(self, recipients):
+        """Blocking wrapper around `run`"""
+        return asyncio.run(self.run(recipients))
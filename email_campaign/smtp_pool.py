@@ -0,0 +1,165 @@
+import smtplib
+import threading
+import time
+import queue
+from contextlib import contextmanager
+
+
+class PooledConnection:
+    """A single authenticated SMTP session owned by an SMTPConnectionPool"""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.server = None
+        self.messages_since_connect = 0
+        self.messages_sent = 0
+        self.failures = 0
+        self.reconnects = 0
+        self.send_time = 0.0
+
+    def connect(self):
+        """Open the SMTP session, upgrade to TLS and log in"""
+        self.close()
+        server = smtplib.SMTP(self.pool.host, self.pool.port, timeout=self.pool.timeout)
+        if self.pool.use_tls:
+            server.starttls()
+        if self.pool.username:
+            server.login(self.pool.username, self.pool.password)
+        self.server = server
+        self.messages_since_connect = 0
+
+    def close(self):
+        """Close the SMTP session, ignoring errors from an already dead socket"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+        self.server = None
+
+    def abort_transaction(self):
+        """After a failed send, RSET so the session is clean for the next message
+
+        A session that cannot be reset is closed; the next send reconnects.
+        """
+        if self.server is None:
+            return
+        try:
+            code, _ = self.server.rset()
+            if code != 250:
+                raise smtplib.SMTPResponseException(code, 'RSET rejected')
+        except Exception:
+            self.close()
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        """Send one message, reconnecting once if the server dropped the session"""
+        if self.server is None:
+            self.connect()
+        elif self.messages_since_connect >= self.pool.max_messages_per_connection:
+            # Rotate long-lived sessions so servers that cap messages per
+            # connection never get to cut us off mid-campaign
+            self.connect()
+            self.reconnects += 1
+
+        start = time.perf_counter()
+        try:
+            try:
+                result = self.server.sendmail(from_addr, to_addrs, msg)
+            except smtplib.SMTPServerDisconnected:
+                self.connect()
+                self.reconnects += 1
+                result = self.server.sendmail(from_addr, to_addrs, msg)
+        except Exception:
+            self.failures += 1
+            self.abort_transaction()
+            raise
+        finally:
+            self.send_time += time.perf_counter() - start
+
+        self.messages_since_connect += 1
+        self.messages_sent += 1
+        return result
+
+    def stats(self):
+        """Return throughput counters for this connection"""
+        rate = self.messages_sent / self.send_time if self.send_time else 0.0
+        return {
+            'connection': self.index,
+            'messages_sent': self.messages_sent,
+            'failures': self.failures,
+            'reconnects': self.reconnects,
+            'send_time': round(self.send_time, 3),
+            'messages_per_sec': round(rate, 2),
+        }
+
+
+class SMTPConnectionPool:
+    """Keep a fixed number of authenticated SMTP sessions open and reuse them"""
+
+    def __init__(self, host, port, username=None, password=None, size=4,
+                 max_messages_per_connection=100, use_tls=True, timeout=30):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.connections = [PooledConnection(self, i) for i in range(size)]
+        self._idle = queue.Queue()
+        for connection in self.connections:
+            self._idle.put(connection)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """Lease an idle connection for the duration of the block"""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+        connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        """Send a message over the next idle pooled connection"""
+        with self.connection() as connection:
+            return connection.sendmail(from_addr, to_addrs, msg)
+
+    def stats(self):
+        """Return per-connection throughput counters"""
+        return [connection.stats() for connection in self.connections]
+
+    def report(self):
+        """Print messages/sec for every pooled connection"""
+        for entry in self.stats():
+            print(
+                f"Connection {entry['connection']}: {entry['messages_sent']} sent, "
+                f"{entry['failures']} failed, {entry['reconnects']} reconnects, "
+                f"{entry['messages_per_sec']} msg/s"
+            )
+
+    def close(self):
+        """Quit every open session"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for connection in self.connections:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
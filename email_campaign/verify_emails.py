@@ -0,0 +1,254 @@
+import argparse
+import csv
+import json
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from recipients import normalize_address
+
+try:
+    import dns.resolver
+    import dns.exception
+except ImportError:  # dnspython is optional, fall back to the system resolver
+    dns = None
+
+# Well-known throwaway mailbox providers
+DISPOSABLE_DOMAINS = {
+    '10minutemail.com', 'guerrillamail.com', 'mailinator.com', 'tempmail.com',
+    'temp-mail.org', 'throwawaymail.com', 'yopmail.com', 'trashmail.com',
+    'getnada.com', 'dispostable.com', 'sharklasers.com', 'maildrop.cc',
+}
+
+# Shared mailboxes that rarely belong to a person
+ROLE_ACCOUNTS = {
+    'abuse', 'admin', 'administrator', 'hostmaster', 'mailer-daemon', 'no-reply',
+    'noreply', 'postmaster', 'root', 'webmaster', 'do-not-reply', 'donotreply',
+}
+
+VALID = 'valid'
+INVALID_SYNTAX = 'invalid_syntax'
+NO_MX = 'no_mx'
+DISPOSABLE = 'disposable'
+ROLE_ACCOUNT = 'role_account'
+# The domain could not be checked (DNS timeout or server failure); not cached
+DNS_UNKNOWN = 'dns_unknown'
+
+CACHE_FILE = os.path.join('..', 'common_data', 'mx_cache.json')
+
+
+def mail_exchangers(mx):
+    """Drop null MX entries ("0 ." per RFC 7505, which resolves to '' or '.')
+
+    A domain whose only exchanger is the null MX accepts no mail, so it ends
+    up with an empty list. None (lookup failed) is passed through.
+    """
+    if mx is None:
+        return None
+    return [host for host in mx if host.strip('.')]
+
+
+class SystemResolver:
+    """Resolve MX records with dnspython, or fall back to A/AAAA via getaddrinfo"""
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+
+    def resolve_mx(self, domain):
+        """Return the mail exchangers for a domain, an empty list if it has none,
+        or None if the lookup failed transiently (timeout, server failure)"""
+        if dns is not None:
+            try:
+                answers = dns.resolver.resolve(domain, 'MX', lifetime=self.timeout)
+                return sorted(mail_exchangers([str(r.exchange).rstrip('.') for r in answers]))
+            except dns.resolver.NoAnswer:
+                pass
+            except dns.resolver.NXDOMAIN:
+                return []
+            except (dns.resolver.NoNameservers, dns.exception.Timeout):
+                return None
+        # RFC 5321: with no MX record the domain's own address is the implicit MX
+        try:
+            socket.getaddrinfo(domain, 25)
+            return [domain]
+        except socket.gaierror as e:
+            return None if e.errno == socket.EAI_AGAIN else []
+        except UnicodeError:
+            return []
+
+
+class StubResolver:
+    """Resolver backed by a fixed {domain: [mx, ...]} mapping, for tests"""
+
+    def __init__(self, records):
+        self.records = {domain.lower(): list(mx) for domain, mx in records.items()}
+        self.lookups = []
+
+    def resolve_mx(self, domain):
+        self.lookups.append(domain)
+        return self.records.get(domain, [])
+
+
+class DomainCache:
+    """On-disk MX lookup cache keyed by domain, with per-entry expiry"""
+
+    def __init__(self, path=CACHE_FILE, ttl=86400, negative_ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = self.load()
+
+    def load(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable MX cache {self.path}: {e}")
+        return {}
+
+    def get(self, domain):
+        """Return cached MX hosts, or None if missing or expired"""
+        entry = self.entries.get(domain)
+        if entry is None or entry['expires'] < time.time():
+            return None
+        return entry['mx']
+
+    def set(self, domain, mx):
+        ttl = self.ttl if mx else self.negative_ttl
+        self.entries[domain] = {'mx': mx, 'expires': time.time() + ttl}
+
+    def save(self):
+        if not self.path:
+            return
+        now = time.time()
+        live = {domain: entry for domain, entry in self.entries.items() if entry['expires'] >= now}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(live, f)
+        os.replace(tmp_path, self.path)
+
+
+class EmailVerifier:
+    """Check syntax, MX, disposable and role accounts for batches of addresses
+
+    Addresses are grouped by domain so each domain is resolved at most once
+    per run; uncached domains are resolved in parallel, `concurrency` at a time.
+    Transient lookup failures are neither cached nor treated as a missing MX.
+    """
+
+    def __init__(self, resolver=None, cache=None, concurrency=16, batch_size=5000,
+                 reject_roles=True, disposable_domains=DISPOSABLE_DOMAINS,
+                 role_accounts=ROLE_ACCOUNTS):
+        self.resolver = resolver or SystemResolver()
+        self.cache = cache if cache is not None else DomainCache()
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.reject_roles = reject_roles
+        self.disposable_domains = disposable_domains
+        self.role_accounts = role_accounts
+        self.domains = {}
+        self.stats = {}
+
+    def resolve_domains(self, domains):
+        """Resolve every domain not seen yet this run, using the cache first"""
+        pending = []
+        for domain in domains:
+            if domain in self.domains:
+                continue
+            cached = mail_exchangers(self.cache.get(domain))
+            if cached is not None:
+                self.domains[domain] = cached
+            else:
+                pending.append(domain)
+        if not pending:
+            return
+
+        def lookup(domain):
+            try:
+                return mail_exchangers(self.resolver.resolve_mx(domain))
+            except Exception as e:
+                print(f"MX lookup failed for {domain}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for domain, mx in zip(pending, executor.map(lookup, pending)):
+                self.domains[domain] = mx
+                if mx is not None:
+                    self.cache.set(domain, mx)
+
+    def classify(self, email):
+        """Return the verification status of one normalized address"""
+        local, domain = email.rsplit('@', 1)
+        if domain in self.disposable_domains:
+            return DISPOSABLE
+        if self.reject_roles and local in self.role_accounts:
+            return ROLE_ACCOUNT
+        mx = self.domains.get(domain)
+        if mx is None:
+            return DNS_UNKNOWN
+        if not mx:
+            return NO_MX
+        return VALID
+
+    def verify_batch(self, addresses):
+        """Return [(original, normalized or None, status)] for a batch"""
+        normalized = [normalize_address(address) for address in addresses]
+        domains = {email.rsplit('@', 1)[1] for email in normalized if email}
+        self.resolve_domains(domains - self.disposable_domains)
+        results = []
+        for address, email in zip(addresses, normalized):
+            status = self.classify(email) if email else INVALID_SYNTAX
+            self.stats[status] = self.stats.get(status, 0) + 1
+            results.append((address, email, status))
+        return results
+
+    def filter(self, recipients, address=lambda recipient: recipient):
+        """Yield recipients whose address verifies, batch by batch
+
+        Addresses whose domain could not be checked are kept: a flaky resolver
+        must not drop whole companies.
+        """
+        recipients = iter(recipients)
+        while True:
+            batch = list(islice(recipients, self.batch_size))
+            if not batch:
+                break
+            results = self.verify_batch([address(recipient) for recipient in batch])
+            for recipient, (_, _, status) in zip(batch, results):
+                if status in (VALID, DNS_UNKNOWN):
+                    yield recipient
+        self.cache.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify scraped email addresses before a campaign')
+    parser.add_argument('input', help='CSV file with an email or email_ids column')
+    parser.add_argument('--output', help='Where to write per-address results (default: <input>.verified.csv)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Parallel DNS lookups')
+    parser.add_argument('--keep-roles', action='store_true', help='Accept role accounts such as admin@ or webmaster@')
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}.verified.csv"
+    verifier = EmailVerifier(concurrency=args.concurrency, reject_roles=not args.keep_roles)
+
+    with open(args.input, newline='', encoding='utf-8') as src, \
+            open(output, 'w', newline='', encoding='utf-8') as dst:
+        reader = csv.DictReader(src)
+        column = 'email' if 'email' in (reader.fieldnames or []) else 'email_ids'
+        writer = csv.writer(dst)
+        writer.writerow(['email', 'status'])
+        while True:
+            batch = [row.get(column, '') for row in islice(reader, verifier.batch_size)]
+            if not batch:
+                break
+            for address, email, status in verifier.verify_batch(batch):
+                writer.writerow([email or address, status])
+    verifier.cache.save()
+    print(f"Verification results written to {output}: {verifier.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import html
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from recipients import normalize_address
+from send_engine import is_transient
+from send_email import (
+    EMAIL_ADDRESS, EMAIL_PASSWORD, MESSAGES_PER_CONNECTION, SMTP_PORT, SMTP_SERVER,
+    build_message,
+)
+from smtp_pool import SMTPConnectionPool
+
+FORM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email_form.html')
+MAX_BODY_BYTES = 64 * 1024
+
+
+class JobQueue:
+    """Bounded queue of send jobs drained by a pool of worker threads
+
+    Submitting never touches SMTP, so form posts stay fast even when the
+    relay is slow or down; the job's status records what happened later.
+    """
+
+    def __init__(self, pool, workers=4, max_pending=1000, max_retries=3,
+                 backoff=2.0, max_jobs_kept=10000):
+        self.pool = pool
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_jobs_kept = max_jobs_kept
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.workers = [
+            threading.Thread(target=self.work, name=f'send-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, to_email, subject, body):
+        """Queue a message; returns the job id, or None if the queue is full"""
+        job_id = uuid.uuid4().hex
+        job = {'id': job_id, 'email': to_email, 'status': 'queued', 'attempts': 0,
+               'error': None, 'created': time.time(), 'updated': time.time()}
+        with self.lock:
+            self.jobs[job_id] = job
+            while len(self.jobs) > self.max_jobs_kept:
+                self.jobs.popitem(last=False)
+        try:
+            self.pending.put_nowait((job_id, to_email, subject, body))
+        except queue.Full:
+            with self.lock:
+                self.jobs.pop(job_id, None)
+            return None
+        return job_id
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated=time.time())
+
+    def work(self):
+        while True:
+            job_id, to_email, subject, body = self.pending.get()
+            try:
+                self.deliver(job_id, to_email, subject, body)
+            finally:
+                self.pending.task_done()
+
+    def deliver(self, job_id, to_email, subject, body):
+        message = build_message(to_email, subject, body)
+        for attempt in range(1, self.max_retries + 2):
+            self.update(job_id, status='sending', attempts=attempt)
+            try:
+                self.pool.sendmail(EMAIL_ADDRESS, to_email, message)
+                self.update(job_id, status='sent', error=None)
+                print(f"Email sent to {to_email}")
+                return
+            except Exception as e:
+                if attempt <= self.max_retries and is_transient(e):
+                    self.update(job_id, status='retrying', error=str(e))
+                    time.sleep(self.backoff * (2 ** (attempt - 1)))
+                    continue
+                self.update(job_id, status='failed', error=str(e))
+                print(f"Failed to send email to {to_email}. Error: {e}")
+                return
+
+
+class EmailFormHandler(BaseHTTPRequestHandler):
+    """Serves the email form, accepts submissions and reports job status"""
+
+    jobs = None
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path in ('/', '/index.html'):
+            with open(FORM_FILE, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path.startswith('/status/'):
+            job = self.jobs.status(self.path[len('/status/'):])
+            if job is None:
+                self.send_json(404, {'error': 'Unknown job id'})
+            else:
+                self.send_json(200, job)
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path not in ('/', '/send'):
+            self.send_json(404, {'error': 'Not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_json(413, {'error': 'Request too large'})
+            return
+        form = parse_qs(self.rfile.read(length).decode('utf-8', 'replace'))
+        to_email = normalize_address(form.get('email', [''])[0])
+        subject = form.get('subject', [''])[0].strip()
+        message = form.get('message', [''])[0]
+        if not to_email or not subject or not message.strip():
+            self.send_json(400, {'error': 'email, subject and message are required'})
+            return
+
+        body = '<p>' + html.escape(message).replace('\n', '<br>') + '</p>'
+        job_id = self.jobs.submit(to_email, subject.replace('\r', ' ').replace('\n', ' '), body)
+        if job_id is None:
+            self.send_json(503, {'error': 'Send queue is full, try again later'},
+                           {'Retry-After': '30'})
+            return
+        status_url = f'/status/{job_id}'
+        self.send_json(202, {'job_id': job_id, 'status': 'queued', 'status_url': status_url},
+                       {'Location': status_url})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the email form without blocking on SMTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4, help='Background send workers')
+    parser.add_argument('--queue-size', type=int, default=1000, help='Maximum queued messages')
+    args = parser.parse_args()
+
+    pool = SMTPConnectionPool(SMTP_SERVER, SMTP_PORT, EMAIL_ADDRESS, EMAIL_PASSWORD,
+                              size=args.workers,
+                              max_messages_per_connection=MESSAGES_PER_CONNECTION)
+    EmailFormHandler.jobs = JobQueue(pool, workers=args.workers, max_pending=args.queue_size)
+    server = ThreadingHTTPServer((args.host, args.port), EmailFormHandler)
+    print(f"Serving email form on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Micro-benchmark: shared extraction engine vs. the old per-page regex scan
+
+    python -m email_scraper.benchmark_extraction .scrapy/httpcache saved_pages/
+
+Any directory is searched recursively for *.html, *.htm, Scrapy
+`response_body` cache files and *.sqlite HTTP cache files (SqliteCacheStorage).
+Without a corpus a synthetic one is generated.
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sqlite3
+import time
+import zlib
+from typing import List
+
+from email_scraper.extraction import extract_emails
+
+
+def legacy_extract(body: bytes) -> set:
+    """What EmailSpider.parse did before: decode, recompile, linear keyword filter"""
+    text = body.decode('utf-8', 'replace')
+    emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text))
+    image_keywords = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '@2x']
+    return {email for email in emails if not any(k in email.lower() for k in image_keywords)}
+
+
+def load_sqlite_cache(file_path: str) -> List[bytes]:
+    with sqlite3.connect(file_path) as db:
+        return [zlib.decompress(body) for (body,) in db.execute('SELECT body FROM responses')]
+
+
+def load_corpus(paths: List[str]) -> List[bytes]:
+    pages = []
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = []
+            for pattern in ('*.html', '*.htm', 'response_body', '*.sqlite'):
+                files.extend(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+        for file_path in files:
+            if file_path.endswith('.sqlite'):
+                pages.extend(load_sqlite_cache(file_path))
+                continue
+            with open(file_path, 'rb') as f:
+                pages.append(f.read())
+    return pages
+
+
+def synthetic_corpus(count: int = 200, seed: int = 7) -> List[bytes]:
+    """Team/blog-like pages; most have no address, some obfuscate theirs"""
+    rng = random.Random(seed)
+    words = b'portfolio founders invest seed growth team about climate fintech series'.split()
+    pages = []
+    for i in range(count):
+        paragraphs = [
+            b'<p>' + b' '.join(rng.choice(words) for _ in range(80)) + b'</p>'
+            for _ in range(rng.randint(50, 400))
+        ]
+        kind = i % 5
+        if kind == 1:
+            paragraphs.append(b'<a href="mailto:partner%d@fund%d.com">Email</a>' % (i, i))
+        elif kind == 2:
+            paragraphs.append(b'<p>partner%d [at] fund%d [dot] com</p>' % (i, i))
+        elif kind == 3:
+            paragraphs.append(b'<img src="/static/logo@2x.png"><p>ir&#64;fund%d.vc</p>' % i)
+        pages.append(b'<html><body>' + b'\n'.join(paragraphs) + b'</body></html>')
+    return pages
+
+
+def bench(function, pages: List[bytes], repeat: int):
+    best = float('inf')
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(function(page)) for page in pages)
+        best = min(best, time.perf_counter() - start)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark email extraction over saved pages')
+    parser.add_argument('paths', nargs='*', help='Files or directories of saved pages')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.paths) if args.paths else []
+    if not pages:
+        print("No saved pages given, using a synthetic corpus")
+        pages = synthetic_corpus()
+    total_mb = sum(len(page) for page in pages) / (1024 * 1024)
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB")
+
+    results = {}
+    for name, function in (('legacy', legacy_extract), ('engine', extract_emails)):
+        elapsed, found = bench(function, pages, args.repeat)
+        results[name] = elapsed
+        print(f"{name:<8} {elapsed * 1000:9.1f} ms  {len(pages) / elapsed:9.0f} pages/s  "
+              f"{total_mb / elapsed:7.1f} MB/s  {found:6d} emails")
+    print(f"Speedup: {results['legacy'] / results['engine']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
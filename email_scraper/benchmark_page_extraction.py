@@ -0,0 +1,135 @@
+"""Micro-benchmark: single-pass lxml page extraction vs. the four BeautifulSoup passes
+
+    python -m email_scraper.benchmark_page_extraction saved_pages/ --team-size 400
+
+Pages are loaded like benchmark_extraction (*.html, *.htm, Scrapy cache files,
+*.sqlite caches). Without a corpus, synthetic team pages are generated: one
+card per person with a bio, social links, data attributes, a mailto link for
+some of them and a JSON-LD block. Some cards hide their address the way real
+team pages do (Cloudflare data-cfemail, right-to-left CSS, a %40 mailto),
+which the legacy passes miss; the mismatch count reports those pages. Times are per-page CPU time (process_time)
+and include parsing, which VCInvestorScraper shares with link discovery.
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from email_scraper.benchmark_extraction import load_corpus
+from email_scraper.extraction import extract_emails, is_valid_email
+from email_scraper.snapshot import PageSnapshot
+
+
+def legacy_extract(html: str) -> set:
+    """What VCInvestorScraper.scrape_page did before: html.parser and four traversals"""
+    soup = BeautifulSoup(html, 'html.parser')
+    emails = set()
+    for text in soup.stripped_strings:
+        emails |= extract_emails(text)
+    for link in soup.select('a[href^="mailto:"]'):
+        email = link.get('href', '').replace('mailto:', '').split('?')[0].strip()
+        if is_valid_email(email):
+            emails.add(email)
+    for elem in soup.find_all(True):
+        for value in elem.attrs.values():
+            if isinstance(value, str) and '@' in value:
+                emails |= extract_emails(value)
+    for script in soup.find_all('script'):
+        if script.string:
+            emails |= extract_emails(script.string)
+    return emails
+
+
+def single_pass_extract(html: str) -> set:
+    return PageSnapshot('https://fund.example.vc/team', html).emails()
+
+
+def cfemail(address: str, key: int) -> str:
+    """Cloudflare's encoding: the XOR key, then every byte XORed with it, in hex"""
+    return f'{key:02x}' + ''.join(f'{b ^ key:02x}' for b in address.encode('utf-8'))
+
+
+def team_page(people: int, rng: random.Random, page: int) -> str:
+    """A large VC team page with a card per partner"""
+    words = 'portfolio founders invest seed growth climate fintech series board operator'.split()
+    cards = []
+    for i in range(people):
+        name = f'person{page}x{i}'
+        bio = ' '.join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+        contact = ''
+        kind = i % 9
+        if kind == 1:
+            contact = f'<a href="mailto:{name}@fund{page}.vc?subject=Hello">Email</a>'
+        elif kind == 2:
+            contact = f'<span class="email">{name} [at] fund{page} [dot] vc</span>'
+        elif kind == 3:
+            contact = f'<button data-email="{name}@fund{page}.vc" aria-label="Contact">Contact</button>'
+        elif kind == 4:
+            contact = (f'<a href="/cdn-cgi/l/email-protection" class="__cf_email__" '
+                       f'data-cfemail="{cfemail(f"{name}@fund{page}.vc", rng.randrange(256))}">'
+                       '[email&#160;protected]</a>')
+        elif kind == 5:
+            reversed_email = f'{name}@fund{page}.vc'[::-1]
+            contact = f'<span style="unicode-bidi: bidi-override; direction: rtl">{reversed_email}</span>'
+        elif kind == 6:
+            contact = f'<a href="mailto:{name}%40fund{page}.vc">Email</a>'
+        cards.append(
+            f'<div class="team-card" data-id="{i}"><img src="/img/{name}@2x.jpg" alt="{name}">'
+            f'<h3>{name.title()}</h3><p class="role">Partner</p><p class="bio">{bio}</p>'
+            f'<ul class="social"><li><a href="https://linkedin.com/in/{name}">LinkedIn</a></li>'
+            f'<li><a href="https://twitter.com/{name}">Twitter</a></li></ul>{contact}</div>'
+        )
+    script = ('<script type="application/ld+json">{"@context": "https://schema.org", '
+              f'"@type": "Organization", "email": "ir@fund{page}.vc"}}</script>')
+    return (f'<html><head><title>Team | Fund {page}</title><style>.team-card{{margin:0}}</style>'
+            f'{script}</head><body><main>{"".join(cards)}</main>'
+            f'<footer>General enquiries: hello&#64;fund{page}.vc</footer></body></html>')
+
+
+def synthetic_corpus(count: int, team_size: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [team_page(team_size, rng, page) for page in range(count)]
+
+
+def bench(function, pages: List[str], repeat: int):
+    best = float('inf')
+    found = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        found = sum(len(function(page)) for page in pages)
+        best = min(best, time.process_time() - start)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-page email extraction on team pages')
+    parser.add_argument('paths', nargs='*', help='Files or directories of saved pages')
+    parser.add_argument('--pages', type=int, default=20, help='Synthetic pages to generate')
+    parser.add_argument('--team-size', type=int, default=300, help='People per synthetic page')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [page.decode('utf-8', 'replace') for page in load_corpus(args.paths)] if args.paths else []
+    if not pages:
+        print(f"No saved pages given, using {args.pages} synthetic team pages of {args.team_size} people")
+        pages = synthetic_corpus(args.pages, args.team_size)
+    total_mb = sum(len(page) for page in pages) / (1024 * 1024)
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB")
+
+    mismatched = sum(legacy_extract(page) != single_pass_extract(page) for page in pages)
+    if mismatched:
+        print(f"Note: {mismatched} pages give different results")
+
+    results = {}
+    for name, function in (('legacy', legacy_extract), ('lxml', single_pass_extract)):
+        elapsed, found = bench(function, pages, args.repeat)
+        results[name] = elapsed
+        print(f"{name:<8} {elapsed / len(pages) * 1000:9.2f} ms CPU/page  "
+              f"{total_mb / elapsed:7.1f} MB/s  {found:6d} emails")
+    print(f"Speedup: {results['legacy'] / results['lxml']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+import atexit
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Set
+from urllib.parse import urlparse
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from fake_useragent import UserAgent
+
+from email_scraper.resource_blocking import BlockingProfile
+from email_scraper.settle import PageSettler
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DRIVER_CACHE = os.path.join(PROJECT_ROOT, 'common_data', 'chromedriver.json')
+
+# Hides navigator.webdriver on every document the browser loads
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# Everything a site can keep in the browser besides cookies
+SITE_STORAGE_TYPES = 'local_storage,session_storage,indexeddb,websql,service_workers,cache_storage'
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+_driver_path_refreshed = False
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def resolve_driver_path(cache_path: Optional[str] = DEFAULT_DRIVER_CACHE, ttl: float = 7 * 86400) -> str:
+    """Path of the chromedriver binary, resolved once per process and cached on disk
+
+    CHROMEDRIVER_PATH wins if set. Otherwise a cached path younger than `ttl`
+    is used without any network access; only when it is missing, stale or
+    gone does webdriver-manager check versions online. If that fails, a stale
+    cached path or a chromedriver on PATH is used instead.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path:
+            return _driver_path
+
+        override = os.environ.get('CHROMEDRIVER_PATH')
+        if _is_executable(override):
+            _driver_path = override
+            return _driver_path
+
+        cached = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable driver cache {cache_path}: {e}")
+        if cached and _is_executable(cached.get('path')) and time.time() - cached.get('resolved', 0) < ttl:
+            _driver_path = cached['path']
+            return _driver_path
+
+        try:
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            fallback = cached.get('path') if cached and _is_executable(cached.get('path')) else None
+            fallback = fallback or shutil.which('chromedriver')
+            if not fallback:
+                raise
+            logger.warning(f"Could not check chromedriver version ({e}), using {fallback}")
+            _driver_path = fallback
+            return _driver_path
+
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump({'path': path, 'resolved': time.time()}, f)
+            except OSError as e:
+                logger.error(f"Error saving driver cache: {e}")
+        _driver_path = path
+        return _driver_path
+
+
+def refresh_driver_path(failed_path: str, cache_path: Optional[str] = DEFAULT_DRIVER_CACHE) -> bool:
+    """After Chrome failed to start with `failed_path`, forget the cached driver once
+
+    Returns True if the next `resolve_driver_path` may give a different binary
+    (it goes online once per process), False if retrying cannot help.
+    """
+    global _driver_path, _driver_path_refreshed
+    with _driver_path_lock:
+        if _driver_path != failed_path:
+            return True  # Another launch already refreshed it
+        if _driver_path_refreshed or _is_executable(os.environ.get('CHROMEDRIVER_PATH')):
+            return False
+        _driver_path_refreshed = True
+        _driver_path = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                os.remove(cache_path)
+            except OSError as e:
+                logger.error(f"Error removing driver cache: {e}")
+        return True
+
+
+class BrowserPool:
+    """Warm headless Chrome instances that the pipeline stages lease in turn
+
+    `acquire` hands out an idle browser (waiting for one that is still
+    launching rather than starting another), or launches one if none is
+    idle. `release` resets it -- cookies, the storage of every site the
+    lease navigated to, blocked URLs, extra windows and the performance log
+    -- and keeps up to `size` for the next lease; the HTTP cache is kept
+    warm on purpose. A launch that fails with a cached chromedriver (e.g.
+    after a Chrome update) re-resolves the driver online and retries once. `warm`
+    pre-launches browsers in the background so their start-up overlaps other
+    work. Every browser has resource-blocking logs, the settle tracker and
+    the webdriver flag hidden. Safe to share between threads.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self.ua = UserAgent()
+        self.idle: List[Future] = []
+        self.lock = threading.Lock()
+        self.launcher = ThreadPoolExecutor(max_workers=max(1, size), thread_name_prefix='browser-launch')
+        self.closed = False
+
+    def launch(self) -> webdriver.Chrome:
+        """Start a configured Chrome"""
+        try:
+            chrome_options = Options()
+            chrome_options.add_argument("--headless")
+            chrome_options.add_argument(f'user-agent={self.ua.random}')
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--window-size=1920,1080")
+            chrome_options.add_argument("--disable-notifications")
+            chrome_options.add_argument("--accept-language=en-US,en;q=0.9")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            BlockingProfile.configure_options(chrome_options)
+
+            start = time.perf_counter()
+            driver_path = resolve_driver_path()
+            try:
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except WebDriverException as e:
+                if not refresh_driver_path(driver_path):
+                    raise
+                logger.warning(f"Chrome failed to start with {driver_path}, resolving the driver again: {e}")
+                driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options)
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": self.ua.random})
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': STEALTH_SCRIPT})
+            PageSettler.install(driver)
+            logger.debug(f"Launched Chrome in {time.perf_counter() - start:.1f}s")
+            return driver
+        except WebDriverException as e:
+            logger.error(f"Failed to initialize WebDriver: {e}")
+            raise
+
+    def warm(self, count: int) -> None:
+        """Pre-launch browsers in the background until `count` are idle or starting"""
+        with self.lock:
+            for _ in range(min(count, self.size) - len(self.idle)):
+                self.idle.append(self.launcher.submit(self.launch))
+
+    def acquire(self) -> webdriver.Chrome:
+        """Lease a browser, warm if one is idle"""
+        while True:
+            with self.lock:
+                if self.closed:
+                    raise RuntimeError('Browser pool is closed')
+                # A ready browser first; otherwise wait for the one launching longest
+                ready = [future for future in self.idle if future.done()]
+                pending = ready[-1] if ready else (self.idle[0] if self.idle else None)
+                if pending is not None:
+                    self.idle.remove(pending)
+            if pending is None:
+                return self.launch()
+            try:
+                return pending.result()
+            except Exception as e:
+                logger.warning(f"Pre-launched browser failed, starting another: {e}")
+
+    def release(self, driver, retire: bool = False) -> None:
+        """Take a browser back; `retire` quits it (crashed or used up) and warms a replacement"""
+        if not retire:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                logger.debug(f"Could not reset browser, retiring it: {e}")
+                retire = True
+        with self.lock:
+            keep = not self.closed and len(self.idle) < self.size
+            if keep and not retire:
+                done: Future = Future()
+                done.set_result(driver)
+                self.idle.append(done)
+                return
+            if keep and retire:
+                self.idle.append(self.launcher.submit(self.launch))
+        self.quit(driver)
+
+    @staticmethod
+    def visited_origins(driver) -> Set[str]:
+        """Origins of every page in the current window's navigation history"""
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        origins = set()
+        for entry in history.get('entries', []):
+            parsed = urlparse(entry.get('url', ''))
+            if parsed.scheme in ('http', 'https'):
+                origins.add(f'{parsed.scheme}://{parsed.netloc}')
+        return origins
+
+    def reset(self, driver) -> None:
+        """Leave nothing of the previous lease behind but the HTTP cache"""
+        handles = driver.window_handles
+        origins = set()
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            origins |= self.visited_origins(driver)
+            if handle != handles[0]:
+                driver.close()
+        driver.switch_to.window(handles[0])
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                   {'origin': origin, 'storageTypes': SITE_STORAGE_TYPES})
+        driver.get('about:blank')
+        driver.execute_cdp_cmd('Page.resetNavigationHistory', {})
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        driver.get_log('performance')  # Events the next lease's blocking report must not count
+
+    @staticmethod
+    def quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Already crashed
+
+    def close(self) -> None:
+        """Quit every idle browser, including ones still launching"""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        self.launcher.shutdown(wait=False)
+        for pending in idle:
+            try:
+                self.quit(pending.result())
+            except Exception:
+                pass
+
+
+_default_pool: Optional[BrowserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> BrowserPool:
+    """The process-wide pool the URL gatherer and the VC scraper share"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -0,0 +1,164 @@
+import re
+from typing import Dict, Iterable, Set, Union
+
+# Precompiled once, shared by the Scrapy spider and the VC scraper
+EMAIL_PATTERN = re.compile(rb'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+LOCAL_PART_PATTERN = re.compile(rb'[a-zA-Z0-9._%+-]{1,64}\Z')
+LOCAL_PART_CHARS = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+DOMAIN_PART_PATTERN = re.compile(rb'[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+VALID_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+IMAGE_PATTERN = re.compile(r'\.(?:png|jpe?g|gif|bmp|svg|webp)|@2x', re.IGNORECASE)
+
+# Entity/percent encodings of '@' (and '.'), rewritten in place before matching
+ENTITY_AT_PATTERN = re.compile(rb'&#(?:0*64|[xX]0*40);|&commat;|%40')
+ENTITY_PATTERN = re.compile(rb'&#(?:0*64|[xX]0*40|0*46|[xX]0*2[eE]);|&commat;|&period;|%40')
+
+# john [at] firm [dot] com, john(at)firm.com, john {at} firm {dot} co {dot} uk
+# AT_TOKEN_PATTERN runs on the lower-cased page; both brackets are required so
+# code such as "format)" or "Date]" is not taken for an obfuscated '@'
+AT_TOKEN_PATTERN = re.compile(rb'[\[\(\{]\s*at\s*[\]\)\}]')
+LOCAL_BEFORE_AT_PATTERN = re.compile(rb'([a-zA-Z0-9._%+-]{1,64})\s*\Z')
+DOMAIN_AFTER_AT_PATTERN = re.compile(
+    rb'\s*([a-zA-Z0-9-]+(?:\s*(?:[\[\(\{]\s*dot\s*[\]\)\}]|\.)\s*[a-zA-Z0-9-]+)+)',
+    re.IGNORECASE,
+)
+DOT_TOKEN_PATTERN = re.compile(rb'\s*[\[\(\{]\s*dot\s*[\]\)\}]\s*|\s*\.\s*', re.IGNORECASE)
+
+# Cloudflare email protection: data-cfemail="<hex>" or /cdn-cgi/l/email-protection#<hex>
+CFEMAIL_PATTERN = re.compile(rb'(?:data-cfemail=["\']|email-protection#)([0-9a-fA-F]{4,})')
+
+# Text rendered right-to-left with CSS so the source holds the address reversed
+REVERSED_PATTERN = re.compile(
+    rb'(?:direction\s*:\s*rtl|unicode-bidi\s*:\s*bidi-override)[^>]*>([^<]{5,254})<',
+    re.IGNORECASE,
+)
+
+# 'john' + '@' + 'firm.com' style string concatenation in scripts
+CONCAT_PATTERN = re.compile(rb'(?:(["\'])[^"\'\n]{0,64}\1\s*\+\s*)+(["\'])[^"\'\n]{0,64}\2')
+CONCAT_JOIN_PATTERN = re.compile(rb'["\']\s*\+\s*["\']')
+QUOTED_AT_MARKERS = (b"'@", b'"@', b"@'", b'@"')
+
+INVALID_DOMAINS = {'example.com', 'test.com', 'domain.com'}
+
+
+def decode_cfemail(encoded: Union[str, bytes]) -> str:
+    """Decode a Cloudflare-protected address (first byte is the XOR key)"""
+    if isinstance(encoded, bytes):
+        encoded = encoded.decode('ascii')
+    data = bytes.fromhex(encoded)
+    key = data[0]
+    return bytes(b ^ key for b in data[1:]).decode('utf-8', 'replace')
+
+
+def is_valid_email(email: str) -> bool:
+    """Validate email address with simplified checks"""
+    if not email or len(email) > 254:
+        return False
+    if not VALID_EMAIL_PATTERN.match(email):
+        return False
+    if IMAGE_PATTERN.search(email):
+        return False
+    return email.rsplit('@', 1)[-1].lower() not in INVALID_DOMAINS
+
+
+def _markers(data: bytes) -> Dict[str, bool]:
+    """Decide which decoders a page needs, using substring checks where possible
+
+    `in` on bytes runs at memory speed, so a page with no marker at all costs a
+    handful of linear scans instead of a regex pass per obfuscation scheme.
+    """
+    has_at = b'@' in data
+    lowered = data.lower()
+    return {
+        'at': has_at,
+        'entity': ((b'&#' in data or b'&commat;' in data or b'%40' in data)
+                   and ENTITY_AT_PATTERN.search(data) is not None),
+        'bracketed': AT_TOKEN_PATTERN.search(lowered) is not None,
+        'cfemail': b'cfemail' in data or b'email-protection' in data,
+        'reversed': has_at and (b'rtl' in lowered or b'bidi-override' in lowered),
+        'concat': has_at and any(marker in data for marker in QUOTED_AT_MARKERS),
+    }
+
+
+def has_email_marker(data: bytes) -> bool:
+    """Cheap pre-check: False means the page cannot contain an address"""
+    if b'@' in data:
+        return True
+    markers = _markers(data)
+    return markers['entity'] or markers['bracketed'] or markers['cfemail']
+
+
+def _entity(match) -> bytes:
+    return b'@' if ENTITY_AT_PATTERN.fullmatch(match.group(0)) else b'.'
+
+
+def _find_plain(data: bytes) -> Iterable[bytes]:
+    """Match addresses only around '@' instead of scanning every byte with the regex"""
+    at = data.find(b'@')
+    while at != -1:
+        local = LOCAL_PART_PATTERN.search(data, max(0, at - 64), at)
+        # A local part running past the 64-byte window is too long, not a shorter address
+        if local and local.start() == at - 64 and local.start() > 0 \
+                and data[local.start() - 1] in LOCAL_PART_CHARS:
+            local = None
+        if local:
+            domain = DOMAIN_PART_PATTERN.match(data, at + 1)
+            if domain:
+                yield data[local.start():domain.end()]
+        at = data.find(b'@', at + 1)
+
+
+def _find_bracketed(data: bytes) -> Iterable[bytes]:
+    """Rebuild `name [at] domain [dot] tld` around each `[at]` token"""
+    for token in AT_TOKEN_PATTERN.finditer(data.lower()):
+        local = LOCAL_BEFORE_AT_PATTERN.search(data, max(0, token.start() - 72), token.start())
+        if not local:
+            continue
+        domain = DOMAIN_AFTER_AT_PATTERN.match(data, token.end())
+        if domain:
+            yield local.group(1) + b'@' + DOT_TOKEN_PATTERN.sub(b'.', domain.group(1))
+
+
+def _candidates(data: bytes, markers: Dict[str, bool]) -> Iterable[bytes]:
+    """Yield raw address candidates, including de-obfuscated ones"""
+    if markers['entity']:
+        data = ENTITY_PATTERN.sub(_entity, data)
+
+    if markers['at'] or markers['entity']:
+        yield from _find_plain(data)
+
+    if markers['bracketed']:
+        yield from _find_bracketed(data)
+
+    if markers['cfemail']:
+        for encoded in CFEMAIL_PATTERN.findall(data):
+            try:
+                yield decode_cfemail(encoded).encode('utf-8')
+            except ValueError:
+                continue
+
+    if markers['reversed']:
+        for text in REVERSED_PATTERN.findall(data):
+            yield from EMAIL_PATTERN.findall(text.strip()[::-1])
+
+    if markers['concat']:
+        for match in CONCAT_PATTERN.finditer(data):
+            expression = match.group(0)
+            if b'@' in expression:
+                joined = CONCAT_JOIN_PATTERN.sub(b'', expression).strip(b'"\'')
+                yield from EMAIL_PATTERN.findall(joined)
+
+
+def extract_emails(data: Union[bytes, str]) -> Set[str]:
+    """Return every valid address in a page body (raw bytes preferred)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    if not data:
+        return set()
+
+    emails = set()
+    for candidate in _candidates(data, _markers(data)):
+        email = candidate.decode('utf-8', 'replace').strip('.')
+        if is_valid_email(email):
+            emails.add(email)
+    return emails
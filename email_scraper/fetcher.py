@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import lxml.html
+import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from email_scraper.snapshot import PageSnapshot, document_links
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODE_CACHE = os.path.join(PROJECT_ROOT, 'common_data', 'fetch_modes.json')
+
+HTTP = 'http'
+BROWSER = 'browser'
+
+# Less visible text than this means the content is rendered by scripts
+MIN_TEXT_LENGTH = 200
+
+# Empty mount points of React/Vue/Next/Nuxt/Angular apps
+SPA_ROOT_PATTERN = re.compile(
+    r'<(?:div|main)[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby)["\'][^>]*>\s*</(?:div|main)>'
+    r'|<app-root[^>]*>\s*</app-root>',
+    re.IGNORECASE,
+)
+NOSCRIPT_WALL_PATTERN = re.compile(
+    r'<noscript[^>]*>(?:(?!</noscript)[\s\S]){0,2000}?(?:enable|requires?|turn on)\s+javascript',
+    re.IGNORECASE,
+)
+
+# Statuses that usually mean a bot wall the browser can get through
+BROWSER_STATUSES = {401, 403, 429, 503}
+
+# Reasons that describe how the site is built and so hold for its other pages;
+# errors, rate limits and bot walls send only the current page to the browser
+PERSISTED_REASONS = {'spa_root', 'noscript_wall', 'no_links'}
+
+VISIBLE_TEXT_XPATH = ('//body//text()[not(ancestor::script) and not(ancestor::style) '
+                      'and not(ancestor::noscript) and not(ancestor::template)]')
+
+
+class FetchResult:
+    """A page fetched over plain HTTP, with its already-parsed snapshot"""
+
+    def __init__(self, snapshot: PageSnapshot, status: int, elapsed: float, size: int):
+        self.snapshot = snapshot
+        self.status = status
+        self.elapsed = elapsed
+        self.size = size
+
+    @property
+    def url(self) -> str:
+        return self.snapshot.url
+
+    @property
+    def html(self) -> str:
+        return self.snapshot.html
+
+    @property
+    def links(self) -> List[str]:
+        return self.snapshot.links
+
+
+def browser_reason(html: str, links: List[str], text_length: int) -> Optional[str]:
+    """Why a page fetched over HTTP needs a browser render, or None if it does not"""
+    if text_length < MIN_TEXT_LENGTH:
+        return 'empty_body'
+    if SPA_ROOT_PATTERN.search(html):
+        return 'spa_root'
+    if NOSCRIPT_WALL_PATTERN.search(html) and text_length < 5 * MIN_TEXT_LENGTH:
+        return 'noscript_wall'
+    if not links:
+        return 'no_links'
+    return None
+
+
+class HybridFetcher:
+    """Fetch pages with a pooled HTTP client and decide when a browser is needed
+
+    `fetch` returns a FetchResult for pages that are complete as served, or
+    None when the page needs JavaScript (empty body, SPA mount point,
+    noscript wall, no links, or a bot-wall status). The first decision for a
+    domain is remembered, in memory and in a JSON file for `ttl` seconds, so
+    JS sites go straight to the browser and static sites never start one.
+    Only structural reasons (PERSISTED_REASONS) pin a domain to the browser.
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, user_agent: str, timeout: float = 15, pool_size: int = 8,
+                 cache_path: Optional[str] = DEFAULT_MODE_CACHE, ttl: float = 7 * 86400):
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.modes: Dict[str, Dict] = self.load()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = {HTTP: 0, BROWSER: 0}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        host = (urlparse(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def load(self) -> Dict[str, Dict]:
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable fetch mode cache {self.cache_path}: {e}")
+        return {}
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        now = time.time()
+        with self.lock:
+            live = {domain: entry for domain, entry in self.modes.items() if entry['expires'] >= now}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f'{self.cache_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(live, f, indent=1)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.error(f"Error saving fetch mode cache: {e}")
+
+    def mode(self, url: str) -> Optional[str]:
+        """Cached fetch mode for the URL's domain, or None if not decided yet"""
+        entry = self.modes.get(self.domain_of(url))
+        if entry is None or entry['expires'] < time.time():
+            return None
+        return entry['mode']
+
+    def decide(self, url: str, mode: str, reason: str = '') -> None:
+        domain = self.domain_of(url)
+        with self.lock:
+            if self.mode(url) is None:
+                self.modes[domain] = {'mode': mode, 'reason': reason, 'expires': time.time() + self.ttl}
+                logger.info(f"Fetching {domain} via {mode}{f' ({reason})' if reason else ''}")
+
+    def count(self, mode: str) -> None:
+        with self.lock:
+            self.stats[mode] += 1
+
+    def fetch(self, url: str) -> Optional[FetchResult]:
+        """Fetch a page over HTTP; None means it has to be rendered in the browser"""
+        if self.mode(url) == BROWSER:
+            self.count(BROWSER)
+            return None
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            return self.escalate(url, 'http_error')
+        elapsed = time.perf_counter() - start
+
+        if response.status_code in BROWSER_STATUSES:
+            return self.escalate(url, f'status_{response.status_code}')
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code >= 400 or 'html' not in content_type.lower():
+            # Nothing a browser would do better; treat as an empty page
+            self.count(HTTP)
+            return FetchResult(PageSnapshot(response.url, ''), response.status_code, elapsed,
+                               len(response.content))
+
+        html = response.text
+        try:
+            document = lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return self.escalate(url, 'empty_body')
+        document.make_links_absolute(response.url, resolve_base_href=True)
+        links = document_links(document)
+        text_length = sum(len(text.strip()) for text in document.xpath(VISIBLE_TEXT_XPATH))
+
+        reason = browser_reason(html, links, text_length)
+        if reason:
+            return self.escalate(url, reason)
+        self.decide(url, HTTP)
+        self.count(HTTP)
+        snapshot = PageSnapshot(response.url, html, document)
+        return FetchResult(snapshot, response.status_code, elapsed, len(response.content))
+
+    def escalate(self, url: str, reason: str) -> None:
+        """Record that the page needs the browser and return None"""
+        # Only the domain's first page sets its mode; later pages of a static
+        # site that need a render are escalated one by one
+        if reason in PERSISTED_REASONS:
+            self.decide(url, BROWSER, reason)
+        else:
+            logger.debug(f"Rendering {url} in the browser ({reason})")
+        self.count(BROWSER)
+        return None
+
+    def close(self) -> None:
+        self.session.close()
+        self.save()
@@ -0,0 +1,98 @@
+import logging
+import re
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Pages that usually list people and their addresses
+RELEVANT_KEYWORDS = {'team', 'about', 'contact', 'people', 'partner', 'investor'}
+
+# Pages that rarely contain addresses but make up most of a site's links
+LOW_VALUE_KEYWORDS = {
+    'blog', 'news', 'press', 'portfolio', 'insights', 'podcast', 'events', 'careers',
+    'jobs', 'tag', 'category', 'author', 'page', 'archive', 'privacy', 'terms', 'cookie',
+}
+
+# Path words: segments split on separators, so /page/2 and /blog-post match but /homepage does not
+PATH_WORD_PATTERN = re.compile(r'[/\-_.]+')
+
+
+def site_of(url: str) -> str:
+    """Site key of a URL: host without port and leading 'www.'"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class SiteStats:
+    """Crawl yield of a single site"""
+
+    def __init__(self):
+        self.pages = 0
+        self.emails = 0
+        self.pages_since_new = 0
+        self.stopped = False
+
+
+class CrawlFrontier:
+    """Score links so contact/team pages are fetched first, and stop cold sites
+
+    Scores combine URL and anchor-text keywords, link depth and how many
+    addresses the site has produced per page so far; the score is used as
+    the Scrapy request priority. A site is stopped once `patience` pages in a
+    row (after at least `min_pages`) produced no new address; its queued
+    requests are then dropped by FrontierMiddleware. Sites are keyed by
+    `site_of`, or by the spider's 'site' request meta when given.
+    """
+
+    def __init__(self, patience: int = 20, min_pages: int = 5):
+        self.patience = patience
+        self.min_pages = min_pages
+        self.sites: Dict[str, SiteStats] = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            patience=settings.getint('FRONTIER_PATIENCE', 20),
+            min_pages=settings.getint('FRONTIER_MIN_PAGES', 5),
+        )
+
+    def site(self, url: str, site: Optional[str] = None) -> SiteStats:
+        key = site or site_of(url)
+        if key not in self.sites:
+            self.sites[key] = SiteStats()
+        return self.sites[key]
+
+    def record_page(self, url: str, new_emails: int, site: Optional[str] = None) -> None:
+        """Update a site's yield after one of its pages was parsed"""
+        stats = self.site(url, site)
+        stats.pages += 1
+        stats.emails += new_emails
+        stats.pages_since_new = 0 if new_emails else stats.pages_since_new + 1
+        if (not stats.stopped and stats.pages >= self.min_pages
+                and stats.pages_since_new >= self.patience):
+            stats.stopped = True
+            logger.info(f"Stopping {site or site_of(url)}: no new emails in "
+                        f"{stats.pages_since_new} pages ({stats.emails} found in {stats.pages})")
+
+    def is_stopped(self, url: str, site: Optional[str] = None) -> bool:
+        return self.site(url, site).stopped
+
+    def score(self, url: str, anchor_text: str = '', depth: int = 0, site: Optional[str] = None) -> int:
+        """Return a request priority for a link; higher is fetched sooner"""
+        path = urlparse(url).path.lower()
+        path_words = set(PATH_WORD_PATTERN.split(path))
+        text = (anchor_text or '').lower()
+        score = 0
+        if any(keyword in path for keyword in RELEVANT_KEYWORDS):
+            score += 50
+        if any(keyword in text for keyword in RELEVANT_KEYWORDS):
+            score += 30
+        if not path_words.isdisjoint(LOW_VALUE_KEYWORDS):
+            score -= 40
+        score -= 10 * depth
+
+        stats = self.site(url, site)
+        if stats.pages:
+            score += min(30, int(30 * stats.emails / stats.pages))
+        return score
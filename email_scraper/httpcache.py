@@ -0,0 +1,94 @@
+import logging
+import os
+import sqlite3
+import time
+import zlib
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteCacheStorage:
+    """HTTP cache storage in one SQLite file per spider, with zlib-compressed bodies
+
+    Replaces FilesystemCacheStorage's directory-per-response layout: lookups
+    are a primary-key read and the whole cache is a single file
+    (HTTPCACHE_DIR/<spider>.sqlite, or <cache_name>.sqlite when the spider has
+    a `cache_name` argument). Pair it with RFC2616Policy so stale entries are
+    revalidated with If-None-Match/If-Modified-Since and a 304 serves the
+    stored body. Each response is committed as it is stored -- cheap in WAL
+    mode -- so crawlers sharing the file never wait on another's open write
+    transaction and see each other's entries at once; a writer that does find
+    the file locked waits up to HTTPCACHE_SQLITE_TIMEOUT seconds.
+    """
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.compress_level = settings.getint('HTTPCACHE_SQLITE_COMPRESS_LEVEL', 6)
+        self.timeout = settings.getfloat('HTTPCACHE_SQLITE_TIMEOUT', 30)
+        self.db = None
+        self.fingerprinter = None
+
+    def open_spider(self, spider) -> None:
+        name = getattr(spider, 'cache_name', None) or spider.name
+        path = os.path.join(self.cachedir, f'{name}.sqlite')
+        self.db = sqlite3.connect(path, timeout=self.timeout)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' fingerprint TEXT PRIMARY KEY,'
+            ' url TEXT NOT NULL,'
+            ' status INTEGER NOT NULL,'
+            ' headers BLOB NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' stored_at REAL NOT NULL)'
+        )
+        self.fingerprinter = spider.crawler.request_fingerprinter
+        count = self.db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        logger.debug(f"Using HTTP cache {path} ({count} responses)")
+
+    def close_spider(self, spider) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def key(self, request) -> str:
+        return self.fingerprinter.fingerprint(request).hex()
+
+    def retrieve_response(self, spider, request):
+        """Return the stored response for a request, or None if missing or expired"""
+        row = self.db.execute(
+            'SELECT url, status, headers, body, stored_at FROM responses WHERE fingerprint = ?',
+            (self.key(request),),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, raw_headers, body, stored_at = row
+        if 0 < self.expiration_secs < time.time() - stored_at:
+            return None
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        body = zlib.decompress(body)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response) -> None:
+        row = (
+            self.key(request),
+            response.url,
+            response.status,
+            headers_dict_to_raw(response.headers),
+            zlib.compress(response.body, self.compress_level),
+            time.time(),
+        )
+        with self.db:  # Commits, so the write lock is held only for this insert
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses (fingerprint, url, status, headers, body, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                row,
+            )
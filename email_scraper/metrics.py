@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from scrapy import signals
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_METRICS_DIR = os.path.join(PROJECT_ROOT, 'common_data', 'metrics')
+
+PHASES = ('fetch', 'render', 'scroll', 'parse')
+COUNTERS = ('requests', 'bytes', 'pages_rendered', 'cache_hits', 'errors', 'emails',
+            'blocked_requests', 'blocked_bytes_estimate')
+
+# Seconds; covers cached Scrapy responses up to slow, scrolled browser pages
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus semantics: cumulative on export)"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound holding the q-th observation (None above the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.buckets, self.cumulative()):
+            if total >= rank:
+                return bound
+        return None
+
+
+class DomainMetrics:
+    """Counters and per-phase latency histograms of one domain"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.phases: Dict[str, Histogram] = {phase: Histogram() for phase in PHASES}
+
+    @property
+    def seconds(self) -> float:
+        return sum(histogram.sum for histogram in self.phases.values())
+
+    def report(self) -> Dict:
+        requests = self.counters['requests']
+        return {
+            **self.counters,
+            'emails_per_request': round(self.counters['emails'] / requests, 4) if requests else 0.0,
+            'seconds': round(self.seconds, 3),
+            'phases': {
+                phase: {
+                    'count': histogram.count,
+                    'seconds': round(histogram.sum, 3),
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                }
+                for phase, histogram in self.phases.items() if histogram.count
+            },
+        }
+
+
+class CrawlMetrics:
+    """Per-domain crawl cost, shared by EmailSpider and VCInvestorScraper
+
+    Call `inc` and `observe` (or use the `timer` context manager) with the
+    page URL; everything is keyed by host without 'www.'. `export` writes a
+    Prometheus textfile (<source>.prom, for node_exporter's textfile
+    collector) and a JSON run report (<source>.json) that lists the domains
+    that used the most crawl time first. Safe to use from several threads.
+    """
+
+    def __init__(self, source: str, metrics_dir: Optional[str] = None):
+        self.source = source
+        self.metrics_dir = metrics_dir or DEFAULT_METRICS_DIR
+        self.domains: Dict[str, DomainMetrics] = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, source: str, settings):
+        return cls(source, metrics_dir=settings.get('METRICS_DIR'))
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        host = (urlparse(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def domain(self, url: str) -> DomainMetrics:
+        key = self.domain_of(url)
+        if key not in self.domains:
+            self.domains[key] = DomainMetrics()
+        return self.domains[key]
+
+    def inc(self, url: str, counter: str, value: int = 1) -> None:
+        with self.lock:
+            self.domain(url).counters[counter] += value
+
+    def observe(self, url: str, phase: str, seconds: float) -> None:
+        with self.lock:
+            self.domain(url).phases[phase].observe(seconds)
+
+    @contextmanager
+    def timer(self, url: str, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(url, phase, time.perf_counter() - start)
+
+    def report(self) -> Dict:
+        with self.lock:
+            domains = {name: metrics.report() for name, metrics in self.domains.items()}
+        ranked = sorted(domains, key=lambda name: domains[name]['seconds'], reverse=True)
+        return {
+            'source': self.source,
+            'started': self.started,
+            'finished': time.time(),
+            'totals': {counter: sum(d[counter] for d in domains.values()) for counter in COUNTERS},
+            'top_domains': ranked[:20],
+            'domains': {name: domains[name] for name in ranked},
+        }
+
+    def prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            items = sorted(self.domains.items())
+            for counter in COUNTERS:
+                name = f'crawl_{counter}_total'
+                lines.append(f'# HELP {name} {counter.replace("_", " ").capitalize()} per domain')
+                lines.append(f'# TYPE {name} counter')
+                for domain, metrics in items:
+                    lines.append(f'{name}{{{self.labels(domain)}}} {metrics.counters[counter]}')
+
+            lines.append('# HELP crawl_emails_per_request New email addresses found per request')
+            lines.append('# TYPE crawl_emails_per_request gauge')
+            for domain, metrics in items:
+                requests = metrics.counters['requests']
+                ratio = metrics.counters['emails'] / requests if requests else 0.0
+                lines.append(f'crawl_emails_per_request{{{self.labels(domain)}}} {ratio:.6g}')
+
+            lines.append('# HELP crawl_phase_seconds Time spent per page in each crawl phase')
+            lines.append('# TYPE crawl_phase_seconds histogram')
+            for domain, metrics in items:
+                for phase, histogram in metrics.phases.items():
+                    if not histogram.count:
+                        continue
+                    labels = self.labels(domain, phase=phase)
+                    for bound, total in zip(histogram.buckets, histogram.cumulative()):
+                        lines.append(f'crawl_phase_seconds_bucket{{{labels},le="{bound}"}} {total}')
+                    lines.append(f'crawl_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f'crawl_phase_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                    lines.append(f'crawl_phase_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def labels(self, domain: str, **extra: str) -> str:
+        pairs = {'source': self.source, 'domain': domain, **extra}
+        escaped = (
+            (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in pairs.items()
+        )
+        return ','.join(f'{key}="{value}"' for key, value in escaped)
+
+    def export(self) -> None:
+        """Write <source>.prom and <source>.json atomically into the metrics directory"""
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            report = self.report()
+            self.write(f'{self.source}.json', json.dumps(report, indent=2))
+            self.write(f'{self.source}.prom', self.prometheus())
+            for domain in report['top_domains'][:5]:
+                stats = report['domains'][domain]
+                logger.info(f"Crawl cost {domain}: {stats['seconds']:.1f}s, {stats['requests']} requests, "
+                            f"{stats['bytes'] / 1024:.0f} KB, {stats['emails']} emails")
+            logger.info(f"Saved crawl metrics to {self.metrics_dir}")
+        except OSError as e:
+            logger.error(f"Error saving crawl metrics: {e}")
+
+    def write(self, name: str, data: str) -> None:
+        # Textfile collectors may read at any time, so never expose a partial file
+        path = os.path.join(self.metrics_dir, name)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class CrawlMetricsExtension:
+    """Feed EmailSpider's CrawlMetrics from Scrapy signals and export on close
+
+    Download latency, response bytes, requests and cache hits come from
+    response_received; the spider records parse time and emails itself.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        extension = cls(crawler)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        crawler.signals.connect(extension.spider_error, signal=signals.spider_error)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def response_received(self, response, request, spider):
+        metrics = getattr(spider, 'metrics', None)
+        if metrics is None:
+            return
+        url = request.url
+        metrics.inc(url, 'requests')
+        metrics.inc(url, 'bytes', len(response.body))
+        if 'cached' in response.flags:
+            metrics.inc(url, 'cache_hits')
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            metrics.observe(url, 'fetch', latency)
+
+    def spider_error(self, failure, response, spider):
+        metrics = getattr(spider, 'metrics', None)
+        if metrics is not None:
+            metrics.inc(response.url, 'errors')
+
+    def spider_closed(self, spider):
+        metrics = getattr(spider, 'metrics', None)
+        if metrics is not None:
+            metrics.export()
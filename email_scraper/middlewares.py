@@ -0,0 +1,197 @@
+import logging
+import posixpath
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured, StopDownload
+from scrapy.linkextractors import IGNORED_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Content types worth scanning for addresses
+ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+SKIPPED_EXTENSIONS = {f'.{extension}' for extension in IGNORED_EXTENSIONS}
+
+
+class PatternStats:
+    """Outcome counts for one learned host/path pattern"""
+
+    def __init__(self):
+        self.rejected = 0
+        self.accepted = 0
+        self.bytes_saved = 0
+
+
+class ResponseGateMiddleware:
+    """Abort bodies that are not HTML/text or too large, as soon as headers arrive
+
+    Content-Type and Content-Length are checked on the headers_received signal
+    and the body size on bytes_received (for chunked responses without a
+    length). Gated downloads are stopped with StopDownload and then dropped
+    here, before the HTTP cache stores them or the spider decodes them.
+
+    Each non-HTML rejection is recorded against a host/path pattern (parent
+    directory plus file extension); once a pattern was rejected
+    GATE_LEARN_THRESHOLD times and never produced HTML (fresh or cached),
+    later requests matching it are not issued. Size-cap rejections are not
+    learned from. The gate is set as the spider's `response_gate`, so its link
+    filter drops matching links before they are queued (gate/skipped/link);
+    requests queued before their pattern was learned are skipped here instead
+    (gate/skipped/learned_pattern).
+    """
+
+    def __init__(self, stats, max_size: int = 2 * 1024 * 1024, learn_threshold: int = 2):
+        self.stats = stats
+        self.max_size = max_size
+        self.learn_threshold = learn_threshold
+        self.patterns: Dict[Tuple[str, str, str], PatternStats] = defaultdict(PatternStats)
+        self.received: Dict[int, int] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('GATE_ENABLED', True):
+            raise NotConfigured
+        middleware = cls(
+            crawler.stats,
+            max_size=settings.getint('GATE_MAX_SIZE', 2 * 1024 * 1024),
+            learn_threshold=settings.getint('GATE_LEARN_THRESHOLD', 2),
+        )
+        crawler.signals.connect(middleware.headers_received, signal=signals.headers_received)
+        crawler.signals.connect(middleware.bytes_received, signal=signals.bytes_received)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    @staticmethod
+    def pattern(url: str) -> Tuple[str, str, str]:
+        parsed = urlparse(url)
+        directory, name = posixpath.split(parsed.path or '/')
+        return (parsed.netloc.lower(), directory, posixpath.splitext(name)[1].lower())
+
+    @staticmethod
+    def content_type(headers) -> str:
+        return headers.get(b'Content-Type', b'').decode('latin-1').split(';')[0].strip().lower()
+
+    def is_learned(self, pattern: Tuple[str, str, str]) -> bool:
+        stats = self.patterns.get(pattern)
+        return stats is not None and not stats.accepted and stats.rejected >= self.learn_threshold
+
+    def skips_link(self, url: str) -> bool:
+        """True if a discovered link matches a learned pattern and should not be queued"""
+        if not self.is_learned(self.pattern(url)):
+            return False
+        self.stats.inc_value('gate/skipped/link')
+        return True
+
+    def spider_opened(self, spider):
+        spider.response_gate = self
+
+    def process_request(self, request, spider):
+        if posixpath.splitext(urlparse(request.url).path)[1].lower() in SKIPPED_EXTENSIONS:
+            self.stats.inc_value('gate/skipped/extension')
+            raise IgnoreRequest(f"Non-HTML extension: {request.url}")
+        pattern = self.pattern(request.url)
+        if self.is_learned(pattern):
+            # Queued before the pattern was learned; estimated from what this
+            # pattern's aborted responses announced
+            stats = self.patterns[pattern]
+            self.stats.inc_value('gate/skipped/learned_pattern')
+            self.stats.inc_value('gate/bytes_saved_estimate', stats.bytes_saved // stats.rejected)
+            raise IgnoreRequest(f"Learned non-HTML pattern: {request.url}")
+        return None
+
+    def headers_received(self, headers, body_length, request, spider):
+        """Stop the download before the body when headers already rule it out"""
+        content_type = self.content_type(headers)
+        if content_type and not content_type.startswith(ALLOWED_CONTENT_TYPES):
+            self.reject(request, 'content_type', body_length, content_type)
+        elif body_length is not None and body_length > self.max_size:
+            self.reject(request, 'size', body_length - self.max_size, f'{body_length} bytes')
+        else:
+            self.received[id(request)] = 0
+
+    def bytes_received(self, data, request, spider):
+        """Enforce the size cap on responses that did not announce a length"""
+        key = id(request)
+        if key not in self.received:
+            return
+        self.received[key] += len(data)
+        if self.received[key] > self.max_size:
+            self.reject(request, 'size', 0, f'over {self.max_size} bytes')
+
+    def reject(self, request, reason: str, bytes_saved: Optional[int], detail: str):
+        self.received.pop(id(request), None)
+        request.meta['gate_rejected'] = reason
+        self.stats.inc_value(f'gate/aborted/{reason}')
+        if bytes_saved and bytes_saved > 0:
+            self.stats.inc_value('gate/bytes_saved', bytes_saved)
+        if reason != 'content_type':
+            # Oversized pages are still HTML; their siblings may be small
+            raise StopDownload(fail=False)
+        pattern = self.pattern(request.url)
+        stats = self.patterns[pattern]
+        stats.rejected += 1
+        stats.bytes_saved += bytes_saved or 0
+        if self.is_learned(pattern) and stats.rejected == self.learn_threshold:
+            self.stats.inc_value('gate/learned_patterns')
+            logger.info(f"Skipping {pattern[0]}{pattern[1]}/*{pattern[2]} from now on ({detail})")
+        raise StopDownload(fail=False)
+
+    def process_response(self, request, response, spider):
+        self.received.pop(id(request), None)
+        reason = request.meta.get('gate_rejected')
+        if reason:
+            raise IgnoreRequest(f"Gated response ({reason}): {request.url}")
+        if 'cached' in response.flags:
+            # Served from the HTTP cache, so headers_received never saw it
+            content_type = self.content_type(response.headers)
+            if content_type and not content_type.startswith(ALLOWED_CONTENT_TYPES):
+                return response
+        self.patterns[self.pattern(request.url)].accepted += 1
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self.received.pop(id(request), None)
+        return None
+
+    def spider_closed(self, spider):
+        learned = sum(1 for pattern in self.patterns if self.is_learned(pattern))
+        saved = self.stats.get_value('gate/bytes_saved', 0)
+        logger.info(f"Response gate: {saved / (1024 * 1024):.1f} MB not downloaded, "
+                    f"{learned} learned non-HTML URL patterns")
+
+
+class FrontierMiddleware:
+    """Drop queued requests of sites the spider's CrawlFrontier has stopped
+
+    A site is stopped while requests for it are still in the scheduler; they
+    are ignored here, before anything is downloaded.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def skips_link(self, url: str) -> bool:
+        """True if a discovered link matches a learned pattern and should not be queued"""
+        if not self.is_learned(self.pattern(url)):
+            return False
+        self.stats.inc_value('gate/skipped/link')
+        return True
+
+    def spider_opened(self, spider):
+        spider.response_gate = self
+
+    def process_request(self, request, spider):
+        frontier = getattr(spider, 'frontier', None)
+        if frontier is not None and frontier.is_stopped(request.url, request.meta.get('site')):
+            self.stats.inc_value('frontier/dropped_requests')
+            raise IgnoreRequest(f"Site stopped by the frontier: {request.url}")
+        return None
@@ -0,0 +1,130 @@
+import csv
+import io
+import os
+import logging
+from typing import List, Set, Tuple
+
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_FILE = os.path.join(PROJECT_ROOT, 'common_data', 'emails.csv')
+
+
+class BufferedEmailCsvPipeline:
+    """Buffer scraped emails and append them to the CSV in batches
+
+    Items are flushed when the buffer reaches EMAIL_PIPELINE_BATCH_SIZE, every
+    EMAIL_PIPELINE_FLUSH_INTERVAL seconds, and when the spider closes. Each
+    flush is a single O_APPEND write followed by fsync, so a crash can at
+    worst lose the unflushed buffer, never corrupt earlier rows. Addresses
+    already in the file are loaded on open, so reruns never duplicate rows.
+    Each row records the site and the page an address was found on; a file
+    from before those columns is upgraded in place on open.
+    """
+
+    columns = ('email_ids', 'site', 'url')
+
+    def __init__(self, output_file: str, batch_size: int = 100, flush_interval: float = 5.0):
+        self.output_file = output_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.seen: Set[str] = set()
+        self.buffer: List[Tuple[str, str, str]] = []
+        self.fd = None
+        self.flush_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            output_file=settings.get('EMAIL_OUTPUT_FILE') or DEFAULT_OUTPUT_FILE,
+            batch_size=settings.getint('EMAIL_PIPELINE_BATCH_SIZE', 100),
+            flush_interval=settings.getfloat('EMAIL_PIPELINE_FLUSH_INTERVAL', 5.0),
+        )
+
+    def open_spider(self, spider) -> None:
+        os.makedirs(os.path.dirname(self.output_file) or '.', exist_ok=True)
+        self.load_existing()
+        self.fd = os.open(self.output_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size == 0:
+            self.write(self.format_rows([self.columns]))
+        elif not self.ends_with_newline():
+            # A previous run died mid-line; terminate it before appending
+            self.write('\n')
+
+        if self.flush_interval > 0:
+            self.flush_loop = task.LoopingCall(self.flush)
+            self.flush_loop.start(self.flush_interval, now=False)
+        logger.info(f"Writing emails to {self.output_file} ({len(self.seen)} already known)")
+
+    def load_existing(self) -> None:
+        """Remember addresses written by earlier runs, upgrading an email-only file"""
+        if not os.path.exists(self.output_file):
+            return
+        with open(self.output_file, 'r', newline='', encoding='utf-8', errors='replace') as f:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+        if not rows:
+            return
+        header, rows = tuple(rows[0]), rows[1:]
+        self.seen.update(row[0].strip().lower() for row in rows)
+        if header == ('email_ids',):
+            self.rewrite([(row[0].strip(), '', '') for row in rows])
+
+    def rewrite(self, rows: List[Tuple[str, str, str]]) -> None:
+        """Replace the file with the current columns and `rows`, atomically"""
+        temp_file = f'{self.output_file}.tmp'
+        with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+            f.write(self.format_rows([self.columns] + rows))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.output_file)
+        logger.info(f"Added site and url columns to {self.output_file}")
+
+    @staticmethod
+    def format_rows(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue()
+
+    def ends_with_newline(self) -> bool:
+        with open(self.output_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def process_item(self, item, spider):
+        email = item.get('email_ids')
+        if email:
+            key = email.strip().lower()
+            if key not in self.seen:
+                self.seen.add(key)
+                self.buffer.append((email.strip(), item.get('site') or '', item.get('url') or ''))
+                if len(self.buffer) >= self.batch_size:
+                    self.flush()
+        return item
+
+    def write(self, data: str) -> None:
+        os.write(self.fd, data.encode('utf-8'))
+        os.fsync(self.fd)
+
+    def flush(self) -> None:
+        """Append every buffered email with one write and one fsync"""
+        if not self.buffer or self.fd is None:
+            return
+        lines, self.buffer = self.buffer, []
+        try:
+            self.write(self.format_rows(lines))
+            logger.debug(f"Flushed {len(lines)} emails to {self.output_file}")
+        except OSError as e:
+            logger.error(f"Error saving {len(lines)} emails to {self.output_file}: {e}")
+            self.buffer = lines + self.buffer
+
+    def close_spider(self, spider) -> None:
+        if self.flush_loop is not None and self.flush_loop.running:
+            self.flush_loop.stop()
+        self.flush()
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        logger.info(f"Saved emails to {self.output_file} ({len(self.seen)} total)")
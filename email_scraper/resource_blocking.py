@@ -0,0 +1,133 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# URL patterns per resource type, for Network.setBlockedURLs (which matches
+# URLs, not types); each extension is blocked with and without a query string
+RESOURCE_EXTENSIONS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp', 'tif', 'tiff'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'stylesheet': ['css'],
+    # No 'ts': it is also TypeScript; blocking the .m3u8 playlist stops HLS segments anyway
+    'media': ['mp4', 'webm', 'mov', 'm4v', 'mp3', 'ogg', 'wav', 'm3u8'],
+}
+
+# Analytics, ads, session replay and chat widgets; none of them hold contact details.
+# Matched against the host (and its subdomains), plus the path prefix if one is given
+TRACKER_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'adservice.google.com', 'connect.facebook.net', 'facebook.net', 'snap.licdn.com',
+    'ads.linkedin.com', 'static.ads-twitter.com', 'analytics.twitter.com', 'hotjar.com',
+    'clarity.ms', 'fullstory.com', 'segment.com', 'segment.io', 'mixpanel.com',
+    'amplitude.com', 'heapanalytics.com', 'optimizely.com', 'nr-data.net', 'newrelic.com',
+    'intercom.io', 'intercomcdn.com', 'js.driftt.com', 'widget.drift.com', 'crisp.chat',
+    'hs-analytics.net', 'hs-banner.com', 'quantserve.com', 'scorecardresearch.com',
+    'player.vimeo.com', 'youtube.com/embed', 'ytimg.com',
+]
+
+# Per-domain exceptions for sites that break with the default profile, e.g.
+# {'example-vc.com': {'allow': ['stylesheet']}}
+DOMAIN_OVERRIDES: Dict[str, Dict[str, List[str]]] = {}
+
+# Typical transfer sizes per CDP resource type, used to estimate bytes that were
+# never downloaded (a blocked request has no size)
+TYPICAL_BYTES = {
+    'Image': 45_000, 'Font': 35_000, 'Stylesheet': 20_000, 'Media': 400_000,
+    'Script': 30_000, 'XHR': 5_000, 'Fetch': 5_000, 'Other': 10_000,
+}
+
+
+class BlockingProfile:
+    """Block images, fonts, media, stylesheets and trackers over CDP, and count the savings
+
+    `configure_options` turns on Chrome's performance log, which carries the
+    Network.loadingFailed events that `page_report` counts per page.
+    `apply` sets the blocked URL patterns for the domain about to be loaded
+    (only when they differ from what the browser already has), so
+    DOMAIN_OVERRIDES can let CSS or images through for sites that need them.
+    """
+
+    def __init__(self, block_types: Iterable[str] = ('image', 'font', 'media', 'stylesheet'),
+                 tracker_domains: Iterable[str] = TRACKER_DOMAINS,
+                 overrides: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self.block_types = list(block_types)
+        self.tracker_domains = list(tracker_domains)
+        self.overrides = DOMAIN_OVERRIDES if overrides is None else overrides
+        self.applied: Dict[int, tuple] = {}
+
+    @staticmethod
+    def configure_options(chrome_options) -> None:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    def override_for(self, url: str) -> Dict[str, List[str]]:
+        host = (urlparse(url).hostname or '').lower()
+        for domain, override in self.overrides.items():
+            if host == domain or host.endswith(f'.{domain}'):
+                return override
+        return {}
+
+    def patterns_for(self, url: str) -> List[str]:
+        """Blocked URL patterns for a page, after that domain's overrides"""
+        override = self.override_for(url)
+        allowed = set(override.get('allow', []))
+        patterns = []
+        for resource_type in self.block_types:
+            if resource_type in allowed:
+                continue
+            for extension in RESOURCE_EXTENSIONS.get(resource_type, []):
+                patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+        if 'tracker' not in allowed:
+            for domain in self.tracker_domains:
+                patterns.extend(self.host_patterns(domain))
+        patterns.extend(override.get('block', []))
+        return patterns
+
+    @staticmethod
+    def host_patterns(domain: str) -> List[str]:
+        """Patterns for a domain and its subdomains only, never query strings or lookalike hosts"""
+        host, _, path = domain.partition('/')
+        return [f'*://{host}/{path}*', f'*://*.{host}/{path}*']
+
+    def apply(self, driver, url: str) -> None:
+        """Set the blocked URLs for the page about to be loaded in this browser"""
+        patterns = tuple(self.patterns_for(url))
+        if self.applied.get(id(driver)) == patterns:
+            return
+        try:
+            if id(driver) not in self.applied:
+                driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+            self.applied[id(driver)] = patterns
+        except Exception as e:
+            logger.debug(f"Could not apply resource blocking: {e}")
+
+    def forget(self, driver) -> None:
+        self.applied.pop(id(driver), None)
+
+    def page_report(self, driver) -> Optional[Dict]:
+        """Requests blocked and bytes avoided since the last call (None without a performance log)"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return None
+        blocked: Dict[str, int] = {}
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') != 'Network.loadingFailed':
+                continue
+            params = message.get('params', {})
+            if params.get('blockedReason'):
+                resource_type = params.get('type', 'Other')
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+        return {
+            'requests': sum(blocked.values()),
+            'bytes_estimate': sum(TYPICAL_BYTES.get(kind, TYPICAL_BYTES['Other']) * count
+                                  for kind, count in blocked.items()),
+            'by_type': blocked,
+        }
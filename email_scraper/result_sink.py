@@ -0,0 +1,162 @@
+import csv
+import io
+import logging
+import os
+import threading
+from typing import Dict, List, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+
+def append_durably(fd: int, data: str) -> None:
+    """One O_APPEND write plus fsync: earlier lines can never be left half-written"""
+    os.write(fd, data.encode('utf-8'))
+    os.fsync(fd)
+
+
+class StreamingCsvSink:
+    """Append result rows to a CSV as they are found, in small fsync'ed batches
+
+    Rows are buffered until `batch_size` are pending or `flush` is called and
+    then written with a single O_APPEND write, like BufferedEmailCsvPipeline.
+    With `resume` the existing file is kept (minus a last row torn by a
+    crash) and the values of `key_field` already in it are returned by
+    `open`, so restarted runs never write a duplicate; otherwise the file is
+    started over. Safe to use from several threads.
+    """
+
+    def __init__(self, output_file: str, fieldnames: Sequence[str], key_field: str,
+                 batch_size: int = 20):
+        self.output_file = output_file
+        self.fieldnames = list(fieldnames)
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self.buffer: List[Dict[str, str]] = []
+        self.written = 0
+        self.fd = None
+        self.lock = threading.Lock()
+
+    def open(self, resume: bool) -> Set[str]:
+        """Open the file for appending and return the keys it already holds"""
+        os.makedirs(os.path.dirname(self.output_file) or '.', exist_ok=True)
+        existing = self.load_keys() if resume else set()
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | (0 if resume else os.O_TRUNC)
+        self.fd = os.open(self.output_file, flags, 0o644)
+        if os.fstat(self.fd).st_size == 0:
+            append_durably(self.fd, self.format([dict(zip(self.fieldnames, self.fieldnames))]))
+        return existing
+
+    def load_keys(self) -> Set[str]:
+        """Keys already in the file; a last row without its newline is cut off first"""
+        if not os.path.exists(self.output_file):
+            return set()
+        with open(self.output_file, 'rb') as f:
+            data = f.read()
+        lines = data.splitlines(keepends=True)
+        reader = csv.reader(line.decode('utf-8', 'replace') for line in lines)
+        rows = []
+        row_ends = []  # Lines consumed after each row (quoted fields may span lines)
+        for row in reader:
+            rows.append(row)
+            row_ends.append(reader.line_num)
+
+        if data and not data.endswith(b'\n'):
+            # The previous run died mid-row: drop it, or an open quote would swallow the next rows
+            rows.pop()
+            row_ends.pop()
+            keep = sum(len(line) for line in lines[:row_ends[-1]]) if row_ends else 0
+            logger.warning(f"Dropping a torn last row of {self.output_file}")
+            with open(self.output_file, 'r+b') as f:
+                f.truncate(keep)
+                os.fsync(f.fileno())
+
+        if not rows or self.key_field not in rows[0]:
+            return set()
+        column = rows[0].index(self.key_field)
+        return {row[column] for row in rows[1:] if len(row) > column and row[column]}
+
+    def format(self, rows: List[Dict[str, str]]) -> str:
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=self.fieldnames, lineterminator='\n')
+        writer.writerows(rows)
+        return out.getvalue()
+
+    def add(self, row: Dict[str, str]) -> None:
+        with self.lock:
+            self.buffer.append(row)
+            if len(self.buffer) >= self.batch_size:
+                self.flush_locked()
+
+    def flush(self) -> None:
+        """Make every buffered row durable"""
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self) -> None:
+        if not self.buffer or self.fd is None:
+            return
+        rows, self.buffer = self.buffer, []
+        try:
+            append_durably(self.fd, self.format(rows))
+            self.written += len(rows)
+        except OSError as e:
+            logger.error(f"Error saving {len(rows)} results to {self.output_file}: {e}")
+            self.buffer = rows + self.buffer
+            raise
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.flush_locked()
+            finally:
+                if self.fd is not None:
+                    os.close(self.fd)
+                    self.fd = None
+
+
+class FirmCheckpoint:
+    """Append-only record of firms whose results are all on disk
+
+    One URL per line, fsync'ed as each firm completes. `complete` must only be
+    called after that firm's rows were flushed to the sink.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        self.fd = None
+        self.lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def open(self) -> Set[str]:
+        if self.exists():
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                # A line without its newline was torn by a crash and is not trusted
+                self.done = {line.strip() for line in f if line.endswith('\n') and line.strip()}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size and not self.ends_with_newline():
+            append_durably(self.fd, '\n')  # Terminate a line torn by a crash
+        return set(self.done)
+
+    def ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def complete(self, url: str) -> None:
+        with self.lock:
+            if url in self.done or self.fd is None:
+                return
+            self.done.add(url)
+            append_durably(self.fd, f'{url}\n')
+
+    def close(self, finished: bool = False) -> None:
+        """Close; a finished run removes the checkpoint so the next one starts fresh"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if finished and self.exists():
+            os.remove(self.path)
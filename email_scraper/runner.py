@@ -0,0 +1,143 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Scrapy stats copied into each spider's run summary
+SUMMARY_STATS = {
+    'requests': 'downloader/request_count',
+    'responses': 'downloader/response_count',
+    'bytes': 'downloader/response_bytes',
+    'cache_hits': 'httpcache/hit',
+    'cache_revalidated': 'httpcache/revalidate',
+    'gate_bytes_saved': 'gate/bytes_saved',
+    'items': 'item_scraped_count',
+    'errors': 'log_count/ERROR',
+}
+
+_DONE = object()
+
+
+def project_settings(**overrides) -> Settings:
+    """email_scraper.settings plus overrides, independent of the working directory"""
+    settings = Settings()
+    settings.setmodule('email_scraper.settings', priority='project')
+    settings.update(overrides, priority='cmdline')
+    return settings
+
+
+class CrawlRun:
+    """Run one or more spiders in this process and stream their items back
+
+    Spiders added with `crawl` share one Twisted reactor, which runs in a
+    background thread once `start` is called. Every scraped item is pushed
+    onto a queue from the item_scraped signal, so the caller can consume
+    results with `items()` while the crawl is still going; `run` does both
+    and returns per-spider stats. The reactor cannot be restarted, so use one
+    CrawlRun per process.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or project_settings()
+        # Keep the caller's logging setup if it has one (e.g. the VC scrapers)
+        self.process = CrawlerProcess(self.settings,
+                                      install_root_handler=not logging.getLogger().handlers)
+        self.crawlers = []
+        self.items_queue: queue.Queue = queue.Queue()
+        self.started = None
+        self.thread = None
+
+    def crawl(self, spider: Any = 'email_spider', **spider_kwargs) -> None:
+        """Schedule a spider (class or name) with its spider arguments"""
+        crawler = self.process.create_crawler(spider)
+        crawler.signals.connect(self.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+        self.crawlers.append(crawler)
+        self.process.crawl(crawler, **spider_kwargs)
+
+    def item_scraped(self, item, response, spider):
+        self.items_queue.put((spider.name, item))
+
+    def spider_closed(self, spider, reason):
+        logger.info(f"Spider {spider.name} closed ({reason})")
+
+    def run_reactor(self) -> None:
+        try:
+            # Signal handlers can only be installed from the main thread; stop() covers Ctrl+C
+            self.process.start(install_signal_handlers=False)
+        finally:
+            # The reactor stops once every crawl finished (or failed to start)
+            self.items_queue.put(_DONE)
+
+    def start(self) -> None:
+        if not self.crawlers:
+            raise ValueError("No spiders scheduled")
+        self.started = time.time()
+        self.thread = threading.Thread(target=self.run_reactor, name='crawl-reactor', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Ask all running spiders to close gracefully"""
+        # Imported late: importing the reactor installs it, and CrawlerProcess
+        # has to install the asyncio reactor from TWISTED_REACTOR first
+        from twisted.internet import reactor
+        reactor.callFromThread(self.process.stop)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (spider name, item) as soon as each item is scraped"""
+        while True:
+            entry = self.items_queue.get()
+            if entry is _DONE:
+                return
+            yield entry
+
+    def join(self) -> Dict[str, Dict]:
+        if self.thread is not None:
+            self.thread.join()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Run summary per spider, keyed by name (name#2, ... for repeated spiders)"""
+        elapsed = time.time() - self.started if self.started else 0.0
+        result = {}
+        for crawler in self.crawlers:
+            name = crawler.spidercls.name
+            key, n = name, 1
+            while key in result:
+                n += 1
+                key = f'{name}#{n}'
+            stats = crawler.stats.get_stats()
+            summary = {field: stats.get(stat, 0) for field, stat in SUMMARY_STATS.items()}
+            summary['finish_reason'] = stats.get('finish_reason')
+            summary['elapsed'] = elapsed
+            result[key] = summary
+        return result
+
+    def run(self, on_item=None) -> Dict[str, Dict]:
+        """Start, hand every item to on_item(spider_name, item), and return the stats"""
+        self.start()
+        try:
+            for name, item in self.items():
+                if on_item is not None:
+                    on_item(name, item)
+        except KeyboardInterrupt:
+            logger.info("Interrupted, closing spiders...")
+            self.stop()
+            for _ in self.items():
+                pass
+        return self.join()
+
+
+def run_spiders(jobs: List[Tuple[Any, Dict]], on_item=None, **setting_overrides) -> Dict[str, Dict]:
+    """Crawl several (spider, spider_kwargs) jobs concurrently in one reactor"""
+    run = CrawlRun(project_settings(**setting_overrides))
+    for spider, spider_kwargs in jobs:
+        run.crawl(spider, **spider_kwargs)
+    return run.run(on_item)
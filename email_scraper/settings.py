@@ -11,29 +11,71 @@ USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = True
 
+# Configure maximum concurrent requests performing at the same time (all sites, batch mode)
+CONCURRENT_REQUESTS = 64
+
 # Configure maximum concurrent requests performing at the same time to the same domain
 CONCURRENT_REQUESTS_PER_DOMAIN = 2
 
 # Configure a delay for requests for the same website (default: 0)
 DOWNLOAD_DELAY = 2
 
+# AutoThrottle adapts each site's delay to its latency; DOWNLOAD_DELAY stays the minimum
+AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_START_DELAY = 2
+AUTOTHROTTLE_MAX_DELAY = 30
+AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+
+# Broad (multi-site) crawl tuning: spread the global concurrency across sites
+# instead of filling it from whichever site has the most queued requests
+SCHEDULER_PRIORITY_QUEUE = 'scrapy.pqueues.DownloaderAwarePriorityQueue'
+REACTOR_THREADPOOL_MAXSIZE = 20  # DNS resolution threads
+DNSCACHE_ENABLED = True
+
 # Enable or disable downloader middlewares
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
+    # First, so requests of sites that went cold are dropped before anything else runs
+    'email_scraper.middlewares.FrontierMiddleware': 50,
     'scrapy.downloadermiddlewares.retry.RetryMiddleware': 90,
     'scrapy.downloadermiddlewares.httpproxy.HttpProxyMiddleware': 110,
+    # Closer to the downloader than the HTTP cache (900), so gated bodies are never cached
+    'email_scraper.middlewares.ResponseGateMiddleware': 950,
 }
 
+# Response gating: abort non-HTML/text bodies and oversized pages as headers arrive
+GATE_ENABLED = True
+GATE_MAX_SIZE = 2 * 1024 * 1024  # Bytes; larger pages are cut off
+GATE_LEARN_THRESHOLD = 2  # Skip a host/path pattern after this many non-HTML responses
+
 # Configure item pipelines
 ITEM_PIPELINES = {
+    'email_scraper.pipelines.BufferedEmailCsvPipeline': 300,
 }
 
+# Per-domain crawl metrics (Prometheus textfile + JSON report, see email_scraper/metrics.py)
+EXTENSIONS = {
+    'email_scraper.metrics.CrawlMetricsExtension': 500,
+}
+METRICS_DIR = None  # Defaults to common_data/metrics
+
+# Buffered CSV output (defaults to common_data/emails.csv)
+EMAIL_OUTPUT_FILE = None
+EMAIL_PIPELINE_BATCH_SIZE = 100  # Flush after this many new emails
+EMAIL_PIPELINE_FLUSH_INTERVAL = 5  # ...or after this many seconds
+
 # Enable and configure HTTP caching (disabled by default)
 HTTPCACHE_ENABLED = True
 HTTPCACHE_EXPIRATION_SECS = 0
 HTTPCACHE_DIR = 'httpcache'
 HTTPCACHE_IGNORE_HTTP_CODES = []
-HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
+# One compressed SQLite file per spider (or per `-a cache_name=...`); stale entries are revalidated with
+# If-None-Match/If-Modified-Since, so re-crawls are mostly 304s
+HTTPCACHE_STORAGE = 'email_scraper.httpcache.SqliteCacheStorage'
+HTTPCACHE_POLICY = 'scrapy.extensions.httpcache.RFC2616Policy'
+HTTPCACHE_ALWAYS_STORE = True  # Keep no-store pages too, so they can be revalidated
+HTTPCACHE_SQLITE_COMPRESS_LEVEL = 6
+HTTPCACHE_SQLITE_TIMEOUT = 30  # Seconds a writer waits for another crawler's lock
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = '2.7'
@@ -42,6 +84,8 @@ FEED_EXPORT_ENCODING = 'utf-8'
 
 # Custom settings for email scraping
 DEPTH_LIMIT = 3  # Limit crawl depth (ie, how many links deep to follow)
+FRONTIER_PATIENCE = 20  # Stop a site after this many pages in a row without a new email
+FRONTIER_MIN_PAGES = 5  # ...but never before this many pages were crawled
 COOKIES_ENABLED = True
 DOWNLOAD_TIMEOUT = 30 # Timeout for requests (ie, how long to wait for a response)
 RETRY_ENABLED = True
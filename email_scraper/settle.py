@@ -0,0 +1,134 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Installed before any page script runs (CDP Page.addScriptToEvaluateOnNewDocument):
+# counts in-flight fetch/XHR requests and stamps the last DOM mutation or
+# network activity, so "settled" can be decided inside the page
+TRACKER_SCRIPT = """
+(() => {
+  if (window.__settle) { return; }
+  const state = window.__settle = {pending: 0, lastActivity: performance.now()};
+  const touch = () => { state.lastActivity = performance.now(); };
+  const started = () => { state.pending += 1; touch(); };
+  const finished = () => { state.pending = Math.max(0, state.pending - 1); touch(); };
+
+  const originalFetch = window.fetch;
+  if (originalFetch) {
+    window.fetch = function () {
+      started();
+      return originalFetch.apply(this, arguments).finally(finished);
+    };
+  }
+  const originalSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    started();
+    this.addEventListener('loadend', finished, {once: true});
+    return originalSend.apply(this, arguments);
+  };
+  try {
+    new PerformanceObserver(touch).observe({entryTypes: ['resource']});
+  } catch (e) {}
+
+  const observe = () => new MutationObserver(touch).observe(
+    document.documentElement, {childList: true, subtree: true, characterData: true});
+  if (document.documentElement) {
+    observe();
+  } else {
+    document.addEventListener('readystatechange', observe, {once: true});
+  }
+})();
+"""
+
+# Optionally scroll to the bottom, then resolve once the page has had no
+# mutation or request for quietMs, no request is in flight and no lazy-load
+# sentinel (aria-busy) is visible -- or when timeoutMs is up
+SETTLE_SCRIPT = """
+const [scroll, quietMs, timeoutMs, done] = arguments;
+const state = window.__settle;
+const body = document.body || document.documentElement;
+const startHeight = body.scrollHeight;
+if (scroll) { window.scrollTo(0, body.scrollHeight); }
+const started = performance.now();
+// aria-busy rather than spinner classes: those stay "visible" when stylesheets are blocked
+const busy = () => Array.from(document.querySelectorAll('[aria-busy="true"]'))
+  .some(element => element.offsetParent !== null);
+(function check() {
+  const now = performance.now();
+  const quiet = state.pending === 0 && now - state.lastActivity >= quietMs && !busy();
+  if (quiet || now - started >= timeoutMs) {
+    done([startHeight, body.scrollHeight, quiet]);
+    return;
+  }
+  setTimeout(check, 50);
+})();
+"""
+
+
+class SettleResult:
+    """How long a page took to settle, and why waiting stopped"""
+
+    def __init__(self, seconds: float, scrolls: int, reason: str):
+        self.seconds = seconds
+        self.scrolls = scrolls
+        self.reason = reason
+
+
+class PageSettler:
+    """Scroll a page until it stops growing, waiting on page events instead of sleeps
+
+    Each step scrolls to the bottom and returns as soon as the DOM and the
+    network have been quiet for `quiet_ms`, or after `step_seconds` on pages
+    that never go quiet (long-polling, chat widgets, carousels). Scrolling
+    stops when the page height no longer grows and the page is quiet, when the
+    height stays the same for `stable_steps` steps in a row, after
+    `max_scrolls` steps or after `max_seconds`.
+    Call `install` once per browser so requests started before the first
+    wait are tracked too; otherwise the tracker is injected on first use.
+    Browsers from BrowserPool have it installed already.
+    """
+
+    def __init__(self, quiet_ms: int = 500, max_scrolls: int = 15, max_seconds: float = 20.0,
+                 step_seconds: float = 2.0, stable_steps: int = 2):
+        self.quiet_ms = quiet_ms
+        self.max_scrolls = max_scrolls
+        self.max_seconds = max_seconds
+        self.step_seconds = step_seconds
+        self.stable_steps = stable_steps
+
+    @staticmethod
+    def install(driver) -> None:
+        """Register the tracker for every document this browser loads"""
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': TRACKER_SCRIPT})
+        except Exception as e:
+            logger.debug(f"CDP unavailable, injecting the settle tracker per page: {e}")
+
+    def step(self, driver, scroll: bool, timeout: float):
+        return driver.execute_async_script(SETTLE_SCRIPT, scroll, self.quiet_ms, int(timeout * 1000))
+
+    def settle(self, driver) -> SettleResult:
+        """Scroll until the page stops growing and is quiet, within the caps"""
+        start = time.monotonic()
+        # Set per call: browsers are shared by settlers with different caps
+        driver.set_script_timeout(self.max_seconds + 5)
+        driver.execute_script(TRACKER_SCRIPT)
+        self.step(driver, False, min(self.step_seconds, self.max_seconds))
+
+        scrolls = 0
+        unchanged = 0
+        reason = 'scroll_cap'
+        while scrolls < self.max_scrolls:
+            remaining = self.max_seconds - (time.monotonic() - start)
+            if remaining <= 0:
+                reason = 'time_cap'
+                break
+            start_height, new_height, quiet = self.step(driver, True, min(self.step_seconds, remaining))
+            scrolls += 1
+            unchanged = unchanged + 1 if new_height <= start_height else 0
+            # A busy network alone doesn't keep a page that stopped growing open
+            if unchanged and (quiet or unchanged >= self.stable_steps):
+                reason = 'settled'
+                break
+        return SettleResult(time.monotonic() - start, scrolls, reason)
@@ -0,0 +1,113 @@
+from typing import List, Optional, Set
+from urllib.parse import unquote, urldefrag, urlparse
+
+import lxml.html
+from lxml import etree
+
+from email_scraper.extraction import extract_emails, is_valid_email
+
+# location.href and the rendered DOM in one WebDriver round trip
+SNAPSHOT_SCRIPT = 'return [location.href, document.documentElement.outerHTML];'
+
+TITLE_SUFFIXES = [' - Home', ' - Contact', ' - About', ' | Contact', ' | About']
+FOCUS_KEYWORDS = ['investment focus', 'investment strategy', 'what we invest in']
+FOCUS_XPATH = ("//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', "
+               "'abcdefghijklmnopqrstuvwxyz'), $keyword)]")
+
+# mailto: hrefs, read from the parse link discovery already made
+MAILTO_HREFS = etree.XPath("//a/@href[starts-with(., 'mailto:')]", smart_strings=False)
+
+
+def document_links(document) -> List[str]:
+    """Absolute <a href> targets without fragments (links must already be absolute)"""
+    return [
+        urldefrag(link)[0]
+        for element, attribute, link, _ in document.iterlinks()
+        if element.tag == 'a' and attribute == 'href'
+    ]
+
+
+def document_emails(data: bytes, document) -> Set[str]:
+    """Addresses in a page's raw HTML plus its mailto links
+
+    The shared engine runs once over the raw bytes, so markup-level
+    obfuscation (data-cfemail, right-to-left styles, split strings, entities)
+    is decoded exactly as the Scrapy spider decodes it.
+    """
+    emails = extract_emails(data)
+    for href in MAILTO_HREFS(document):
+        email = unquote(href[len('mailto:'):].split('?')[0]).strip()
+        if is_valid_email(email):
+            emails.add(email)
+    return emails
+
+
+class PageSnapshot:
+    """One copy of a page's HTML, queried locally with lxml
+
+    Taken once per page (from the browser with `from_driver`, or from an HTTP
+    fetch), so link discovery, email extraction, firm name and focus areas
+    cost no further WebDriver round trips and share one parse, made on first use.
+    """
+
+    def __init__(self, url: str, html: str, document=None):
+        self.url = url
+        self.html = html
+        self._document = document
+        self._data: Optional[bytes] = None
+        self._links: Optional[List[str]] = None
+
+    @classmethod
+    def from_driver(cls, driver) -> 'PageSnapshot':
+        url, html = driver.execute_script(SNAPSHOT_SCRIPT)
+        return cls(url, html)
+
+    @property
+    def document(self):
+        if self._document is None:
+            try:
+                self._document = lxml.html.document_fromstring(self.html or '<html></html>')
+            except (etree.ParserError, ValueError):
+                self._document = lxml.html.document_fromstring('<html></html>')
+            self._document.make_links_absolute(self.url, resolve_base_href=True)
+        return self._document
+
+    @property
+    def data(self) -> bytes:
+        """The HTML as bytes, the form the extraction engine scans"""
+        if self._data is None:
+            self._data = (self.html or '').encode('utf-8', 'replace')
+        return self._data
+
+    @property
+    def links(self) -> List[str]:
+        if self._links is None:
+            self._links = document_links(self.document)
+        return self._links
+
+    def emails(self) -> Set[str]:
+        return document_emails(self.data, self.document)
+
+    def firm_name(self) -> str:
+        """Schema.org organization name, else the cleaned-up title, else the domain"""
+        for element in self.document.xpath('//*[@typeof="Organization"][@property="name"]'):
+            name = element.text_content().strip()
+            if name:
+                return name
+
+        title = self.document.findtext('.//title')
+        if title and title.strip():
+            for suffix in TITLE_SUFFIXES:
+                title = title.replace(suffix, '')
+            return title.strip()
+
+        domain = urlparse(self.url).netloc
+        return domain.replace('www.', '').split('.')[0].title()
+
+    def additional_info(self) -> str:
+        """Meta description plus any investment focus/strategy text"""
+        info = self.document.xpath("//meta[@name='description']/@content")[:1]
+        for keyword in FOCUS_KEYWORDS:
+            for element in self.document.xpath(FOCUS_XPATH, keyword=keyword):
+                info.append(element.text_content().strip())
+        return ' | '.join(filter(None, info))
@@ -1,127 +1,42 @@
 import scrapy
-import re
-import os
+import csv
 import logging
+import time
 from urllib.parse import urlparse
+from email_scraper.extraction import extract_emails
+from email_scraper.frontier import CrawlFrontier, site_of
+from email_scraper.metrics import CrawlMetrics
 
 class EmailSpider(scrapy.Spider):
     name = "email_spider"
 
-    # Set to store unique emails
-    # Duplicate definition of found_emails removed
-
     custom_settings = {
         'ROBOTSTXT_OBEY': True,  # Ensures we obey robots.txt rules
         'LOG_LEVEL': 'INFO',  # Set logging level
-        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3',
-        'DOWNLOAD_DELAY': 1  # Delay between requests
     }
 
-    def __init__(self, url=None, *args, **kwargs):
+    def __init__(self, url=None, urls_file=None, *args, **kwargs):
         super(EmailSpider, self).__init__(*args, **kwargs)
-        if url:
+        # Set to store unique emails (persistence is handled by BufferedEmailCsvPipeline)
+        self.found_emails = set()
+        if urls_file:
+            # Batch mode: crawl every site in the file concurrently in one reactor
             try:
-                # Parse the domain from the URL and set it as the allowed domain
-                parsed_url = urlparse(url)
-                self.start_urls = [url]
-                self.allowed_domains = [parsed_url.netloc]
-
-                # Define the output folder and file using absolute paths
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                self.external_folder = os.path.join(project_root, 'common_data')
-                os.makedirs(self.external_folder, exist_ok=True)  # Create the folder if it doesn't exist
-                self.output_file = os.path.join(self.external_folder, 'emails.csv')
-
-                # Write headers if file doesn't exist
-                if not os.path.exists(self.output_file):
-                    self.write_headers()
-
-                logging.info(f"Scraper initialized for URL: {url}")
-
+                self.start_urls = self.load_urls(urls_file)
+                self.allowed_domains = sorted({self.site_of(u) for u in self.start_urls})
+                logging.info(f"Scraper initialized for {len(self.allowed_domains)} sites "
+                             f"({len(self.start_urls)} start URLs) from {urls_file}")
             except Exception as e:
                 self.start_urls = []
                 self.allowed_domains = []
-                logging.error(f"Error initializing scraper: {e}")
-        else:
-            self.start_urls = []
-            self.allowed_domains = []
-            logging.warning("No URL provided. Spider will not run.")
-
-    def parse(self, response):
-        try:
-            # Extract email addresses from the current page using regex
-            emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', response.text))
-
-            # Filter out invalid emails based on image-related keywords
-            image_keywords = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '@2x']
-            for email in emails:
-                if not any(keyword in email.lower() for keyword in image_keywords):
-                    if email not in self.found_emails:  # Only process unique emails
-                        self.found_emails.add(email)
-                        yield {'email_ids': email}  # Yield the email to be saved as CSV
-                        self.save_email(email)  # Append email to file
-
-            # Extract and follow internal links (only non-image links)
-            links = response.css('a::attr(href)').getall()
-            image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg')
-
-            for link in links:
-                # Handle relative links and filter out images
-                if not link.lower().endswith(image_extensions):
-                    yield response.follow(link, callback=self.parse)
-
-        except Exception as e:
-            logging.error(f"Error parsing response from {response.url}: {e}")
-
-    def write_headers(self):
-        """Write headers to the file (if not exists)."""
-        try:
-            with open(self.output_file, 'w', newline='') as f:
-                f.write('email_ids\n')  # Write the header for the email_ids column
-            logging.info(f"Headers written to {self.output_file}")
-        except Exception as e:
-            logging.error(f"Error writing headers to {self.output_file}: {e}")
-
-    def save_email(self, email):
-        """Append the email to the external CSV file."""
-        try:
-            with open(self.output_file, 'a', newline='') as f:
-                f.write(f"{email}\n")  # Save email under the 'email_ids' column
-            logging.info(f"Saved email: {email}")
-        except Exception as e:
-            logging.error(f"Error saving email {email} to {self.output_file}: {e}") 
-
-
-class EmailSpider(scrapy.Spider):  # noqa: F811
-    name = "email_spider"
-
-    # Set to store unique emails
-    found_emails = set()
-
-    custom_settings = {
-        'ROBOTSTXT_OBEY': True,  # Ensures we obey robots.txt rules
-        'LOG_LEVEL': 'INFO',  # Set logging level
-    }
-
-    def __init__(self, url=None, *args, **kwargs):
-        super(EmailSpider, self).__init__(*args, **kwargs)
-        if url:
+                logging.error(f"Error loading URLs from {urls_file}: {e}")
+        elif url:
             try:
                 # Parse the domain from the URL and set it as the allowed domain
                 parsed_url = urlparse(url)
                 self.start_urls = [url]
                 self.allowed_domains = [parsed_url.netloc]
 
-                # Define the output folder and file using absolute paths
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                self.external_folder = os.path.join(project_root, 'common_data')
-                os.makedirs(self.external_folder, exist_ok=True)  # Create the folder if it doesn't exist
-                self.output_file = os.path.join(self.external_folder, 'emails.csv')
-
-                # Write headers if file doesn't exist
-                if not os.path.exists(self.output_file):
-                    self.write_headers()
-
                 logging.info(f"Scraper initialized for URL: {url}")
 
             except Exception as e:
@@ -133,46 +48,85 @@ class EmailSpider(scrapy.Spider):  # noqa: F811
             self.allowed_domains = []
             logging.warning("No URL provided. Spider will not run.")
 
+    @staticmethod
+    def site_of(url):
+        """Site key of a URL: host without port and leading 'www.'"""
+        return site_of(url)
+
+    @staticmethod
+    def load_urls(urls_file):
+        """Read start URLs from a CSV with a 'url' column (e.g. vc_firms_urls.csv)"""
+        urls = []
+        seen = set()
+        with open(urls_file, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                url = (row.get('url') or '').strip()
+                if not url:
+                    continue
+                if '://' not in url:
+                    url = f'https://{url}'
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+        return urls
+
+    def start_requests(self):
+        for url in self.start_urls:
+            yield scrapy.Request(url, callback=self.parse, meta={'site': self.site_of(url)})
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(EmailSpider, cls).from_crawler(crawler, *args, **kwargs)
+        # Scores links into request priorities and stops sites that went cold
+        spider.frontier = CrawlFrontier.from_settings(crawler.settings)
+        # Per-domain cost; fed and exported by CrawlMetricsExtension
+        spider.metrics = CrawlMetrics.from_settings(cls.name, crawler.settings)
+        return spider
+
     def parse(self, response):
         try:
-            # Extract email addresses from the current page using regex
-            emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', response.text))
-
-            # Filter out invalid emails based on image-related keywords
-            image_keywords = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '@2x']
-            for email in emails:
-                if not any(keyword in email.lower() for keyword in image_keywords):
-                    if email not in self.found_emails:  # Only process unique emails
-                        self.found_emails.add(email)
-                        yield {'email_ids': email}  # Yield the email to be saved as CSV
-                        self.save_email(email)  # Append email to file
-
-            # Extract and follow internal links (only non-image links)
-            links = response.css('a::attr(href)').getall()
+            # Extract (and de-obfuscate) email addresses straight from the raw body;
+            # image file names such as logo@2x.png are filtered out by the engine
+            start = time.perf_counter()
+            site = response.meta.get('site') or self.site_of(response.url)
+            new_emails = 0
+            for email in extract_emails(response.body):
+                if email not in self.found_emails:  # Only process unique emails
+                    self.found_emails.add(email)
+                    new_emails += 1
+                    # Saved by the item pipeline, with the site and page it came from
+                    yield {'email_ids': email, 'site': site, 'url': response.url}
+            self.metrics.observe(response.url, 'parse', time.perf_counter() - start)
+            self.metrics.inc(response.url, 'emails', new_emails)
+
+            # Stop following links once the site stops producing new emails;
+            # FrontierMiddleware drops the site's requests that are already queued
+            self.frontier.record_page(response.url, new_emails, site)
+            if self.frontier.is_stopped(response.url, site):
+                return
+
+            # Follow internal links (only non-image links), contact/team pages first
             image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg')
-
-            for link in links:
+            skipped_schemes = ('mailto:', 'tel:', 'javascript:')
+            depth = response.meta.get('depth', 0) + 1
+            # URL patterns ResponseGateMiddleware learned never return HTML
+            gate = getattr(self, 'response_gate', None)
+            # Keep each site's crawl inside that site, even when other sites
+            # of the batch are allowed domains too
+            for link in response.css('a'):
+                href = (link.attrib.get('href') or '').strip()
                 # Handle relative links and filter out images
-                if not link.lower().endswith(image_extensions):
-                    yield response.follow(link, callback=self.parse)
+                if not href or href.lower().endswith(image_extensions) or href.lower().startswith(skipped_schemes):
+                    continue
+                url = response.urljoin(href)
+                link_site = self.site_of(url)
+                if link_site != site and not link_site.endswith(f'.{site}'):
+                    continue
+                if gate is not None and gate.skips_link(url):
+                    continue
+                anchor_text = ' '.join(link.css('::text').getall())
+                yield response.follow(url, callback=self.parse, meta={'site': site},
+                                      priority=self.frontier.score(url, anchor_text, depth, site))
 
         except Exception as e:
             logging.error(f"Error parsing response from {response.url}: {e}")
-
-    def write_headers(self):
-        """Write headers to the file (if not exists)."""
-        try:
-            with open(self.output_file, 'w', newline='') as f:
-                f.write('email_ids\n')  # Write the header for the email_ids column
-            logging.info(f"Headers written to {self.output_file}")
-        except Exception as e:
-            logging.error(f"Error writing headers to {self.output_file}: {e}")
-
-    def save_email(self, email):
-        """Append the email to the external CSV file."""
-        try:
-            with open(self.output_file, 'a', newline='') as f:
-                f.write(f"{email}\n")  # Save email under the 'email_ids' column
-            logging.info(f"Saved email: {email}")
-        except Exception as e:
-            logging.error(f"Error saving email {email} to {self.output_file}: {e}")
@@ -1,18 +1,23 @@
 import time
-import csv
-import re
 import logging
-from typing import Set, List, Dict
+import queue
+import random
+import threading
+from typing import Set, List, Dict, Optional
 from contextlib import contextmanager
 from urllib.parse import urlparse
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
+from email_scraper.browser_pool import BrowserPool, default_pool
+from email_scraper.extraction import has_email_marker, is_valid_email
+from email_scraper.fetcher import BROWSER, HybridFetcher
+from email_scraper.frontier import RELEVANT_KEYWORDS
+from email_scraper.snapshot import PageSnapshot
+from email_scraper.metrics import CrawlMetrics
+from email_scraper.result_sink import FirmCheckpoint, StreamingCsvSink
+from email_scraper.resource_blocking import BlockingProfile
+from email_scraper.settle import PageSettler
 
 # Configure logging
 logging.basicConfig(
@@ -21,79 +26,290 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Split of the last navigation into fetch (request to last byte) and render
+# (last byte to load event) milliseconds, plus bytes transferred for the page
+NAVIGATION_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+const resources = performance.getEntriesByType('resource')
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+return [nav.responseEnd - nav.startTime, Math.max(0, nav.loadEventEnd - nav.responseEnd),
+        (nav.transferSize || 0) + resources];
+"""
+
+class DomainThrottle:
+    """Per-domain politeness: spaces requests to the same domain, across all workers"""
+
+    def __init__(self, delay: float = 2.0, jitter: float = 0.2):
+        self.delay = delay
+        self.jitter = jitter
+        self.next_slot: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        domain = urlparse(url).netloc.lower()
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(domain, now))
+            delay = self.delay
+            if random.random() < self.jitter:  # Occasional longer pause
+                delay += random.uniform(2, 4)
+            self.next_slot[domain] = slot + delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class VCInvestorScraper:
-    def __init__(self, urls: List[str], output_file: str = 'common_data/vc_investors_emails.csv'):
+    def __init__(self, urls: List[str], output_file: str = 'common_data/vc_investors_emails.csv',
+                 workers: int = 4, pages_per_browser: int = 50, domain_delay: float = 2.0,
+                 browsers: Optional[BrowserPool] = None):
         self.urls = urls
         self.output_file = output_file
         self.ua = UserAgent()
         self.emails_found: Set[str] = set()
-        self.results: List[Dict[str, str]] = []
-        self.driver = None
-        self.setup_driver()
+        # Rows reach the CSV in small fsync'ed batches as they are found; a firm is
+        # checkpointed once its rows are on disk, so an interrupted run resumes
+        self.sink = StreamingCsvSink(output_file, ['email', 'firm_name', 'url', 'additional_info'], 'email')
+        self.checkpoint = FirmCheckpoint(f'{output_file}.checkpoint')
+        # Firms are scraped by `workers` threads, each leasing its own Chrome from
+        # the shared pool (thread-local driver); a browser is retired after
+        # pages_per_browser pages
+        self.workers = workers
+        self.pages_per_browser = pages_per_browser
+        self.browsers = browsers or default_pool()
+        self.local = threading.local()
+        self.results_lock = threading.Lock()
+        # Set when a run is interrupted, so workers stop before the results are closed
+        self.stopping = threading.Event()
+        self.throttle = DomainThrottle(domain_delay)
+        self.settler = PageSettler()
+        # Images, fonts, media, stylesheets and trackers are never downloaded
+        self.blocking = BlockingProfile()
+        self.metrics = CrawlMetrics('vc_investor_scraper')
+        # Static pages are fetched over HTTP; Chrome is started only for pages that need it
+        self.fetcher = HybridFetcher(self.ua.random, pool_size=max(8, workers))
+
+    @property
+    def driver(self):
+        """This worker thread's Chrome, or None before its first render"""
+        return getattr(self.local, 'driver', None)
+
+    @driver.setter
+    def driver(self, value) -> None:
+        self.local.driver = value
+        self.local.pages = 0
+
+    @property
+    def snapshot(self) -> PageSnapshot:
+        """The page this worker is currently scraping"""
+        return getattr(self.local, 'snapshot', None)
+
+    @snapshot.setter
+    def snapshot(self, value: PageSnapshot) -> None:
+        self.local.snapshot = value
+
+    @property
+    def page_info(self) -> Dict[str, Dict[str, str]]:
+        """Firm name and focus per page URL of the firm this worker is scraping"""
+        if not hasattr(self.local, 'page_info'):
+            self.local.page_info = {}
+        return self.local.page_info
 
     def setup_driver(self) -> None:
-        """Initialize the Chrome WebDriver with proper error handling"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument(f'user-agent={self.ua.random}')
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--disable-notifications")
-            chrome_options.add_argument("--accept-language=en-US,en;q=0.9")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=chrome_options
-            )
-            self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": self.ua.random})
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        except WebDriverException as e:
-            logger.error(f"Failed to initialize WebDriver: {e}")
-            raise
+        """Lease a warm Chrome from the browser pool"""
+        self.driver = self.browsers.acquire()
+
+    def quit_driver(self, retire: bool = False) -> None:
+        """Hand this worker's Chrome back to the pool; `retire` replaces it with a fresh one"""
+        if self.driver:
+            self.blocking.forget(self.driver)
+            self.browsers.release(self.driver, retire)
+            self.driver = None
+
+    def recover(self, error: Exception) -> bool:
+        """Drop a crashed browser so the next render starts a fresh one"""
+        if isinstance(error, WebDriverException) and self.driver is not None:
+            try:
+                self.driver.current_url
+            except Exception:
+                logger.warning("Browser crashed, starting a new one")
+                self.quit_driver(retire=True)
+                return True
+        return False
 
     @contextmanager
     def driver_context(self):
-        """Context manager for WebDriver to ensure proper cleanup"""
+        """Context manager for WebDriver to ensure it goes back to the pool"""
         try:
             yield self.driver
         finally:
-            if self.driver:
-                self.driver.quit()
+            self.quit_driver()
 
     def scrape(self) -> None:
-        """Main scraping method with proper error handling and cleanup"""
+        """Main scraping method: workers pull firms from a shared queue"""
+        resume = self.checkpoint.exists()
+        done = self.checkpoint.open()
+        self.emails_found |= self.sink.open(resume)
+        pending = [url for url in dict.fromkeys(self.urls) if url not in done]
+        if resume:
+            logger.info(f"Resuming: {len(self.urls) - len(pending)} firms already done, "
+                        f"{len(self.emails_found)} emails already in {self.output_file}")
+
+        firms: queue.Queue = queue.Queue()
+        for url in pending:
+            firms.put((url, 0))
+        threads = [
+            threading.Thread(target=self.worker, args=(firms,), name=f'vc-worker-{i}', daemon=True)
+            for i in range(max(1, min(self.workers, len(pending))))
+        ]
+        finished = False
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            finished = True
+        finally:
+            if not finished:
+                self.stop_workers(threads)
+            self.fetcher.close()
+            self.save_results(finished)
+            self.metrics.export()
+            logger.info(f"Pages fetched over HTTP: {self.fetcher.stats['http']}, "
+                        f"rendered in Chrome: {self.fetcher.stats['browser']}")
+
+    def stop_workers(self, threads: List[threading.Thread], timeout: float = 30.0) -> None:
+        """Let workers finish their current firm (within `timeout`) and take no new ones"""
+        self.stopping.set()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        running = sum(thread.is_alive() for thread in threads)
+        if running:
+            logger.warning(f"{running} workers still running; results they find now are not saved")
+
+    def worker(self, firms: queue.Queue) -> None:
+        """Scrape firms until the queue is empty, with a thread-local browser"""
         with self.driver_context():
-            for url in self.urls:
+            while not self.stopping.is_set():
+                try:
+                    url, attempt = firms.get_nowait()
+                except queue.Empty:
+                    return
                 logger.info(f"Scraping {url}")
+                self.page_info.clear()
                 try:
                     self.scrape_url(url)
+                    self.sink.flush()
+                    self.checkpoint.complete(url)
                 except Exception as e:
+                    self.metrics.inc(url, 'errors')
                     logger.error(f"Error processing {url}: {e}")
-                self.apply_rate_limit()
-            
-            self.save_results()
+                    if self.recover(e) and attempt == 0:
+                        firms.put((url, attempt + 1))  # One more try on a fresh browser
 
     def scrape_url(self, url: str) -> None:
-        """Scrape a single URL and its relevant pages"""
-        self.driver.get(url)
+        """Scrape a single URL and its relevant pages, over HTTP where possible"""
+        result = self.fetch_page(url)
+        if result is None:
+            self.render_url(url)
+            return
+
+        # Links are resolved against the final URL, after any www./https redirect
+        relevant_urls = self.relevant_links(result.url, result.links)
+        for page_url in relevant_urls:
+            try:
+                page = result if page_url == result.url else self.fetch_page(page_url)
+                if page is None:
+                    self.render_page(page_url)
+                else:
+                    with self.metrics.timer(page_url, 'parse'):
+                        self.scrape_page(page_url, page.snapshot)
+            except Exception as e:
+                self.metrics.inc(page_url, 'errors')
+                logger.error(f"Error scraping {page_url}: {e}")
+                self.recover(e)
+
+    def fetch_page(self, url: str):
+        """Fetch a page without the browser; None if it needs a render"""
+        if self.fetcher.mode(url) != BROWSER:
+            self.apply_rate_limit(url)
+        result = self.fetcher.fetch(url)
+        if result is not None:
+            self.metrics.inc(url, 'requests')
+            self.metrics.inc(url, 'bytes', result.size)
+            self.metrics.observe(url, 'fetch', result.elapsed)
+        return result
+
+    def render_url(self, url: str) -> None:
+        """Scrape a single URL and its relevant pages in the browser"""
+        self.load_page(url)
         self.handle_cookie_consent()
-        self.apply_rate_limit()
         
-        self.scroll_page()
-        relevant_urls = self.find_relevant_pages(url)
+        with self.metrics.timer(url, 'scroll'):
+            self.scroll_page()
+        self.record_blocking(url)
+        # One transfer of the rendered page serves link discovery and the scrape itself
+        snapshot = PageSnapshot.from_driver(self.driver)
+        relevant_urls = self.relevant_links(snapshot.url, snapshot.links)
         
         for page_url in relevant_urls:
             try:
-                self.driver.get(page_url)
-                self.handle_cookie_consent()
-                self.scroll_page()
-                self.scrape_page(page_url)
+                if page_url == snapshot.url:
+                    with self.metrics.timer(page_url, 'parse'):
+                        self.scrape_page(page_url, snapshot)
+                else:
+                    self.render_page(page_url)
             except Exception as e:
+                self.metrics.inc(page_url, 'errors')
                 logger.error(f"Error scraping {page_url}: {e}")
-            self.apply_rate_limit()
+                self.recover(e)
+
+    def render_page(self, url: str) -> None:
+        """Render, scroll and scrape one page in the browser"""
+        self.load_page(url)
+        self.handle_cookie_consent()
+        with self.metrics.timer(url, 'scroll'):
+            self.scroll_page()
+        self.record_blocking(url)
+        with self.metrics.timer(url, 'parse'):
+            self.scrape_page(url, PageSnapshot.from_driver(self.driver))
+
+    def record_blocking(self, url: str) -> None:
+        """Count what the blocking profile kept this page (incl. its scrolling) from loading"""
+        blocked = self.blocking.page_report(self.driver)
+        if blocked:
+            self.metrics.inc(url, 'blocked_requests', blocked['requests'])
+            self.metrics.inc(url, 'blocked_bytes_estimate', blocked['bytes_estimate'])
+            logger.debug(f"Blocked {blocked['requests']} requests (~{blocked['bytes_estimate'] / 1024:.0f} KB) "
+                         f"on {url}: {blocked['by_type']}")
+
+    def load_page(self, url: str) -> None:
+        """Navigate to a page and record its fetch/render cost"""
+        if self.driver is not None and self.local.pages >= self.pages_per_browser:
+            # Recycle long-lived browsers before they bloat or leak memory
+            self.quit_driver(retire=True)
+        if self.driver is None:
+            self.setup_driver()
+        self.blocking.apply(self.driver, url)
+        self.apply_rate_limit(url)
+        self.local.pages += 1
+        start = time.perf_counter()
+        self.driver.get(url)
+        elapsed = time.perf_counter() - start
+        self.metrics.inc(url, 'requests')
+        self.metrics.inc(url, 'pages_rendered')
+        try:
+            timing = self.driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+        except Exception:
+            timing = None
+        if timing:
+            fetch_ms, render_ms, transferred = timing
+            self.metrics.observe(url, 'fetch', fetch_ms / 1000)
+            self.metrics.observe(url, 'render', render_ms / 1000)
+            self.metrics.inc(url, 'bytes', int(transferred))
+        else:
+            self.metrics.observe(url, 'render', elapsed)
 
     def handle_cookie_consent(self) -> None:
         """Handle cookie consent popups"""
@@ -117,185 +333,91 @@ class VCInvestorScraper:
                 continue
 
     def scroll_page(self) -> None:
-        """Scroll page to load dynamic content"""
+        """Scroll page to load dynamic content, until it settles"""
         try:
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            result = self.settler.settle(self.driver)
+            logger.debug(f"Scrolled {self.driver.current_url} in {result.seconds:.2f}s "
+                         f"({result.scrolls} scrolls, {result.reason})")
         except Exception as e:
             logger.error(f"Error scrolling page: {e}")
 
-    def apply_rate_limit(self) -> None:
-        """Apply rate limiting between requests"""
-        time.sleep(2)  # Base delay
-        if random.random() < 0.2:  # 20% chance of longer delay
-            time.sleep(random.uniform(2, 4))
+    def apply_rate_limit(self, url: str) -> None:
+        """Wait for the URL's domain to be due; other domains are not held up"""
+        self.throttle.wait(url)
 
-    def find_relevant_pages(self, base_url: str) -> Set[str]:
-        """Find relevant pages to scrape using efficient URL checking"""
+    def relevant_links(self, base_url: str, hrefs: List[str]) -> Set[str]:
+        """Same-site links whose URL mentions a team/contact/about keyword"""
         relevant_urls = {base_url}
         base_domain = urlparse(base_url).netloc
-        
-        try:
-            links = self.driver.find_elements(By.TAG_NAME, "a")
-            relevant_keywords = {'team', 'about', 'contact', 'people', 'partner', 'investor'}
-            
-            for link in links:
-                try:
-                    href = link.get_attribute('href')
-                    if not href:
-                        continue
-                    
-                    parsed_url = urlparse(href)
-                    if (parsed_url.netloc == base_domain and
-                        any(keyword in href.lower() for keyword in relevant_keywords)):
-                        relevant_urls.add(href)
-                except Exception:
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error finding relevant pages: {e}")
-            
+        for href in hrefs:
+            if (href and urlparse(href).netloc == base_domain and
+                    any(keyword in href.lower() for keyword in RELEVANT_KEYWORDS)):
+                relevant_urls.add(href)
         return relevant_urls
 
-    def scrape_page(self, url: str) -> None:
-        """Scrape a single page for emails and information"""
-        html = self.driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
-
-        self.extract_visible_emails(soup, url)
-        self.extract_mailto_links(soup, url)
-        self.extract_obfuscated_emails(soup, url)
-        self.extract_from_scripts(soup, url)
-
-    def extract_emails_from_text(self, text: str) -> Set[str]:
-        """Extract and validate emails from text"""
-        if not text:
-            return set()
-            
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails = set(re.findall(email_pattern, text))
-        return {email for email in emails if self.is_valid_email(email)}
-
-    def extract_visible_emails(self, soup: BeautifulSoup, url: str) -> None:
-        """Extract visible email addresses from text"""
-        for text in soup.stripped_strings:
-            for email in self.extract_emails_from_text(text):
-                self.add_result(email, url)
-
-    def extract_mailto_links(self, soup: BeautifulSoup, url: str) -> None:
-        """Extract email addresses from mailto links"""
-        for link in soup.select('a[href^="mailto:"]'):
-            href = link.get('href', '')
-            email = href.replace('mailto:', '').split('?')[0].strip()
-            if self.is_valid_email(email):
-                self.add_result(email, url)
-
-    def extract_obfuscated_emails(self, soup: BeautifulSoup, url: str) -> None:
-        """Handle common email obfuscation techniques"""
-        for elem in soup.find_all(True):
-            for value in elem.attrs.values():
-                if isinstance(value, str) and '@' in value:
-                    for email in self.extract_emails_from_text(value):
-                        self.add_result(email, url)
-
-    def extract_from_scripts(self, soup: BeautifulSoup, url: str) -> None:
-        """Extract emails from script tags"""
-        for script in soup.find_all('script'):
-            if script.string:
-                for email in self.extract_emails_from_text(script.string):
-                    self.add_result(email, url)
+    def scrape_page(self, url: str, snapshot: PageSnapshot) -> None:
+        """Scrape a single page snapshot for emails"""
+        if not has_email_marker(snapshot.data):
+            return
+        self.snapshot = snapshot
+        # One engine pass over the raw HTML (decoders included) plus mailto links
+        for email in snapshot.emails():
+            self.add_result(email, url)
 
     def is_valid_email(self, email: str) -> bool:
         """Validate email address with simplified checks"""
-        if not email or len(email) > 254:
-            return False
-            
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            return False
-            
-        # Check for common invalid patterns
-        invalid_domains = {'example.com', 'test.com', 'domain.com'}
-        domain = email.split('@')[-1].lower()
-        
-        return domain not in invalid_domains
+        return is_valid_email(email)
 
     def add_result(self, email: str, url: str) -> None:
         """Add a new result to the collection"""
-        if email not in self.emails_found:
+        with self.results_lock:
+            if email in self.emails_found:
+                return
             self.emails_found.add(email)
-            firm_name = self.extract_firm_name(url)
-            self.results.append({
-                'email': email,
-                'firm_name': firm_name,
-                'url': url,
-                'additional_info': self.extract_additional_info(url)
-            })
-            logger.info(f"Found email: {email} at {url}")
+        self.metrics.inc(url, 'emails')
+        # Page lookups run outside the lock so workers don't wait on each other
+        result = {
+            'email': email,
+            'firm_name': self.extract_firm_name(url),
+            'url': url,
+            'additional_info': self.extract_additional_info(url)
+        }
+        self.sink.add(result)
+        logger.info(f"Found email: {email} at {url}")
+
+    def page_metadata(self, url: str) -> Dict[str, str]:
+        """Firm name and focus of a page, extracted once per URL from its snapshot"""
+        info = self.page_info.get(url)
+        if info is None:
+            snapshot = self.snapshot
+            if snapshot is None:
+                snapshot = PageSnapshot(url, '')
+            info = {
+                'firm_name': snapshot.firm_name(),
+                'additional_info': snapshot.additional_info(),
+            }
+            self.page_info[url] = info
+        return info
 
     def extract_firm_name(self, url: str) -> str:
         """Extract firm name from the page"""
-        try:
-            # Try schema.org data
-            elements = self.driver.find_elements(By.CSS_SELECTOR, '[typeof="Organization"][property="name"]')
-            if elements:
-                return elements[0].text.strip()
-            
-            # Try title
-            title = self.driver.title
-            if title:
-                for suffix in [' - Home', ' - Contact', ' - About', ' | Contact', ' | About']:
-                    title = title.replace(suffix, '')
-                return title.strip()
-        except Exception:
-            pass
-        
-        # Fallback to URL
-        domain = urlparse(url).netloc
-        return domain.replace('www.', '').split('.')[0].title()
+        return self.page_metadata(url)['firm_name']
 
     def extract_additional_info(self, url: str) -> str:
         """Extract additional relevant information"""
-        info = []
-        try:
-            # Meta description
-            elements = self.driver.find_elements(By.CSS_SELECTOR, "meta[name='description']")
-            if elements:
-                info.append(elements[0].get_attribute('content'))
-            
-            # Investment focus
-            keywords = ['investment focus', 'investment strategy', 'what we invest in']
-            for keyword in keywords:
-                elements = self.driver.find_elements(
-                    By.XPATH,
-                    f"//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{keyword}')]"
-                )
-                for elem in elements:
-                    info.append(elem.text.strip())
-        except Exception as e:
-            logger.error(f"Error extracting additional info: {e}")
-        
-        return ' | '.join(filter(None, info))
+        return self.page_metadata(url)['additional_info']
 
-    def save_results(self) -> None:
-        """Save results to CSV file with proper error handling"""
+    def save_results(self, finished: bool = False) -> None:
+        """Flush the last results; the checkpoint is kept unless every firm was processed"""
         try:
-            with open(self.output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=['email', 'firm_name', 'url', 'additional_info'])
-                writer.writeheader()
-                writer.writerows(self.results)
-            logger.info(f"Saved {len(self.results)} emails to {self.output_file}")
+            self.sink.close()
+            logger.info(f"Saved {self.sink.written} new emails to {self.output_file}")
         except Exception as e:
             logger.error(f"Error saving results: {e}")
+            finished = False
+        self.checkpoint.close(finished)
 
 if __name__ == '__main__':
-    import random
     test_urls = [
         'https://www.sequoiacap.com',
         'https://www.accel.com',
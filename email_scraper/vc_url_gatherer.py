@@ -1,19 +1,18 @@
 import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
+from email_scraper.browser_pool import BrowserPool, default_pool
+from email_scraper.resource_blocking import BlockingProfile
+from email_scraper.settle import PageSettler
 import json
 import time
 import csv
 import logging
 import os
 import random
-from typing import Set
+from typing import Optional, Set
 from datetime import datetime
 
 # Configure logging
@@ -28,12 +27,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class VCUrlGatherer:
-    def __init__(self, output_file='email_scraper/vc_firms_urls.csv'):
+    def __init__(self, output_file='email_scraper/vc_firms_urls.csv', browsers: Optional[BrowserPool] = None):
         self.output_file = output_file
         self.checkpoint_file = f"{output_file}.checkpoint"
         self.ua = UserAgent()
         self.urls: Set[str] = self.load_checkpoint()
         self.session = self.setup_session()
+        self.settler = PageSettler(max_scrolls=50, max_seconds=60.0)  # Directories are long lists
+        self.blocking = BlockingProfile()
+        # Leased from the pool the VC scraper uses next, so its browser is already warm
+        self.browsers = browsers or default_pool()
         self.driver = self.setup_driver()
         self.last_request_time = 0
         self.min_request_interval = 2  # seconds
@@ -49,23 +52,8 @@ class VCUrlGatherer:
         return session
 
     def setup_driver(self) -> webdriver.Chrome:
-        """Setup Chrome WebDriver with proper error handling"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument(f'user-agent={self.ua.random}')
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--disable-notifications")
-            
-            return webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=chrome_options
-            )
-        except WebDriverException as e:
-            logger.error(f"Failed to initialize WebDriver: {e}")
-            raise
+        """Lease a Chrome WebDriver from the browser pool"""
+        return self.browsers.acquire()
 
     def load_checkpoint(self) -> Set[str]:
         """Load URLs from checkpoint file if it exists"""
@@ -103,7 +91,8 @@ class VCUrlGatherer:
             logger.error(f"Error during URL gathering: {e}")
             self.save_checkpoint()  # Save progress even if there's an error
         finally:
-            self.driver.quit()
+            self.blocking.forget(self.driver)
+            self.browsers.release(self.driver)
 
     def gather_from_vc_directories(self) -> None:
         """Gather URLs from known VC directories"""
@@ -128,6 +117,7 @@ class VCUrlGatherer:
                 
                 # Retry mechanism
                 max_retries = 3
+                self.blocking.apply(self.driver, directory)
                 for attempt in range(max_retries):
                     try:
                         self.driver.get(directory)
@@ -140,6 +130,10 @@ class VCUrlGatherer:
                 
                 # Wait for dynamic content and scroll
                 self.scroll_page()
+                blocked = self.blocking.page_report(self.driver)
+                if blocked:
+                    logger.info(f"Blocked {blocked['requests']} requests "
+                                f"(~{blocked['bytes_estimate'] / 1024:.0f} KB) on {directory}")
                 
                 # Find and collect VC firm URLs
                 links = self.driver.find_elements(By.TAG_NAME, "a")
@@ -160,16 +154,11 @@ class VCUrlGatherer:
                 logger.error(f"Error gathering from {directory}: {e}")
 
     def scroll_page(self) -> None:
-        """Scroll page to load dynamic content"""
+        """Scroll page to load dynamic content, until it settles or hits the caps"""
         try:
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(random.uniform(1.0, 2.0))
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            result = self.settler.settle(self.driver)
+            logger.info(f"Scrolled {self.driver.current_url} in {result.seconds:.1f}s "
+                        f"({result.scrolls} scrolls, {result.reason})")
         except Exception as e:
             logger.error(f"Error scrolling page: {e}")
 
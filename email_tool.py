@@ -4,8 +4,10 @@ import subprocess
 import argparse
 from email_scraper.vc_url_gatherer import VCUrlGatherer
 from email_scraper.vc_investor_scraper import VCInvestorScraper
+from email_scraper.browser_pool import BrowserPool
+from email_scraper.runner import CrawlRun
 
-def run_scraper(url=None, vc_mode=False):
+def run_scraper(url=None, vc_mode=False, urls_file=None, workers=4):
     print("Running email scraper...")
     if vc_mode:
         print("Using VC-specific scraper...")
@@ -13,28 +15,45 @@ def run_scraper(url=None, vc_mode=False):
             # Run VC-specific scraper with single URL
             print("\nScraping specific URL...")
             urls = [url]
-            scraper = VCInvestorScraper(urls)
+            scraper = VCInvestorScraper(urls, workers=workers)
             scraper.scrape()
         else:
-            # Gather VC firm URLs
-            print("Gathering VC firm URLs...")
-            gatherer = VCUrlGatherer()
-            gatherer.gather_urls()
-            
-            # Read gathered URLs
-            with open('email_scraper/vc_firms_urls.csv', 'r') as f:
-                next(f)  # Skip header
-                urls = [line.strip() for line in f]
-            
-            # Run VC-specific scraper
-            scraper = VCInvestorScraper(urls)
-            scraper.scrape()
+            # Both stages lease from one pool: the gatherer's browser and the ones
+            # pre-launched while it runs are already warm when the scraper starts
+            browsers = BrowserPool(size=workers)
+            try:
+                # Gather VC firm URLs
+                print("Gathering VC firm URLs...")
+                gatherer = VCUrlGatherer(browsers=browsers)
+                browsers.warm(workers - 1)
+                gatherer.gather_urls()
+
+                # Read gathered URLs
+                with open('email_scraper/vc_firms_urls.csv', 'r') as f:
+                    next(f)  # Skip header
+                    urls = [line.strip() for line in f]
+
+                # Run VC-specific scraper
+                scraper = VCInvestorScraper(urls, workers=workers, browsers=browsers)
+                scraper.scrape()
+            finally:
+                browsers.close()
     else:
-        # Run regular email spider
-        cmd = ['scrapy', 'crawl', 'email_spider']
-        if url:
-            cmd.extend(['-a', f'url={url}'])
-        subprocess.run(cmd, cwd=os.path.join('email_scraper'))
+        # Run regular email spider in this process; items stream back as they are found
+        run = CrawlRun()
+        if urls_file:
+            # Batch mode: every site in the file, concurrently in one crawl
+            run.crawl('email_spider', urls_file=os.path.abspath(urls_file))
+        else:
+            run.crawl('email_spider', url=url)
+
+        def on_item(spider_name, item):
+            print(f"Found email: {item['email_ids']} on {item['url']}")
+
+        for name, stats in run.run(on_item).items():
+            print(f"{name}: {stats['items']} emails, {stats['requests']} requests, "
+                  f"{stats['cache_hits']} cache hits, {stats['errors']} errors "
+                  f"in {stats['elapsed']:.1f}s ({stats['finish_reason']})")
     print("Email scraper finished.")
 
 def run_email_campaign():
@@ -44,7 +63,9 @@ def run_email_campaign():
 def main():
     parser = argparse.ArgumentParser(description='Email Automation Tool')
     parser.add_argument('--url', help='URL to scrape')
+    parser.add_argument('--urls-file', help='CSV with a url column to crawl in one batch (e.g. email_scraper/vc_firms_urls.csv)')
     parser.add_argument('--vc', action='store_true', help='Use VC-specific scraper')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel browser workers for the VC scraper')
     parser.add_argument('--no-campaign', action='store_true', help='Skip email campaign')
     args = parser.parse_args()
     
@@ -52,7 +73,7 @@ def main():
     data_file = os.path.join('common_data', 'vc_investors_emails.csv' if args.vc else 'emails.csv')
     
     # Step 1: Run the scraper
-    run_scraper(args.url, args.vc)
+    run_scraper(args.url, args.vc, args.urls_file, args.workers)
     
     # Step 2: Check if emails were found and run campaign if requested
     if os.path.exists(data_file) and os.stat(data_file).st_size > 0:
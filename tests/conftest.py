@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# email_scraper is a package; the email_campaign scripts import each other flat
+for path in (ROOT, os.path.join(ROOT, 'email_campaign')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,50 @@
+from email import message_from_bytes, policy
+
+import pytest
+
+from message_template import CompiledTemplate, encode_header_value
+
+
+def compile_template(subject='Hello ${firm_name}', body='<p>Dear ${firm_name},</p><p>${note}</p>'):
+    return CompiledTemplate.compile('Sender', 'sender@fund.vc', subject, body)
+
+
+def headers_of(message):
+    return message.split(b'\r\n\r\n', 1)[0]
+
+
+def test_line_break_in_recipient_is_rejected():
+    template = compile_template()
+    for address in ('victim@firm.com\r\nBcc: list@spam.com', 'victim@firm.com\nBcc: list@spam.com'):
+        with pytest.raises(ValueError):
+            template.render(address, {'firm_name': 'Firm'})
+
+
+def test_line_break_in_subject_field_cannot_add_a_header():
+    template = compile_template()
+    message = template.render('partner@firm.com', {'firm_name': 'Firm\r\nBcc: list@spam.com'})
+    parsed = message_from_bytes(message, policy=policy.SMTP)
+    assert parsed['Bcc'] is None
+    assert parsed['Subject'] == 'Hello Firm Bcc: list@spam.com'
+
+
+def test_body_values_get_crlf_line_endings():
+    template = compile_template()
+    message = template.render('partner@firm.com', {'firm_name': 'Firm', 'note': 'one\ntwo\rthree\r\nfour'})
+    assert b'one\r\ntwo\r\nthree\r\nfour' in message
+    assert b'\n' not in message.replace(b'\r\n', b'')
+    assert b'\r' not in message.replace(b'\r\n', b'')
+
+
+def test_long_subject_is_folded():
+    template = compile_template()
+    firm = ' '.join(['Ventures'] * 30)
+    message = template.render('partner@firm.com', {'firm_name': firm})
+    assert all(len(line) <= 78 for line in headers_of(message).split(b'\r\n'))
+    assert message_from_bytes(message, policy=policy.SMTP)['Subject'] == f'Hello {firm}'
+
+
+def test_non_ascii_subject_is_encoded_and_folded():
+    value = encode_header_value('Subject', 'Grüße an ' + 'Kapital ' * 20)
+    assert value.startswith('=?utf-8?')
+    assert all(len(line) <= 78 for line in ('Subject: ' + value).split('\r\n'))
@@ -0,0 +1,51 @@
+import random
+
+from email_scraper.benchmark_page_extraction import team_page
+from email_scraper.extraction import has_email_marker
+from email_scraper.snapshot import PageSnapshot
+
+
+def cfemail(address: str, key: int = 0x42) -> str:
+    return f'{key:02x}' + ''.join(f'{ord(c) ^ key:02x}' for c in address)
+
+
+def emails(html: str) -> set:
+    snapshot = PageSnapshot('https://fund.example.vc/team', html)
+    assert has_email_marker(snapshot.data)
+    return snapshot.emails()
+
+
+def test_cloudflare_protected_page():
+    html = ('<html><body><div class="card"><h3>Jane</h3>'
+            f'<a href="/cdn-cgi/l/email-protection" class="__cf_email__" data-cfemail="{cfemail("jane@fund.vc")}">'
+            '[email&#160;protected]</a></div>'
+            f'<a href="/cdn-cgi/l/email-protection#{cfemail("ir@fund.vc")}">Investor relations</a>'
+            '</body></html>')
+    assert emails(html) == {'jane@fund.vc', 'ir@fund.vc'}
+
+
+def test_right_to_left_page():
+    html = ('<html><body><p>Contact: '
+            '<span style="unicode-bidi: bidi-override; direction: rtl">cv.dnuf@nhoj</span>'
+            '</p></body></html>')
+    assert emails(html) == {'john@fund.vc'}
+
+
+def test_plain_text_attributes_and_mailto():
+    html = ('<html><body><p>Write to hello@fund.vc</p>'
+            '<button data-email="deals@fund.vc">Pitch</button>'
+            '<a href="mailto:partners@fund.vc?subject=Hi">Email</a>'
+            '<img src="/img/jane@2x.jpg"></body></html>')
+    assert emails(html) == {'hello@fund.vc', 'deals@fund.vc', 'partners@fund.vc'}
+
+
+def test_percent_encoded_mailto():
+    html = '<html><body><a href="mailto:jane%40fund.vc?subject=Hello%20there">Email</a></body></html>'
+    assert emails(html) == {'jane@fund.vc'}
+
+
+def test_obfuscated_team_page():
+    people = 18
+    page = team_page(people, random.Random(3), 0)
+    expected = {f'person0x{i}@fund0.vc' for i in range(people) if 1 <= i % 9 <= 6}
+    assert emails(page) == expected | {'ir@fund0.vc', 'hello@fund0.vc'}
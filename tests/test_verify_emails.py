@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('pandas')  # verify_emails normalizes addresses with recipients, which needs pandas
+
+from verify_emails import NO_MX, VALID, DomainCache, EmailVerifier, StubResolver
+
+
+def verifier(records):
+    return EmailVerifier(resolver=StubResolver(records), cache=DomainCache(path=None))
+
+
+@pytest.mark.parametrize('null_mx', [[''], ['.']])
+def test_null_mx_domain_accepts_no_mail(null_mx):
+    results = verifier({'nomail.com': null_mx}).verify_batch(['partner@nomail.com'])
+    assert results == [('partner@nomail.com', 'partner@nomail.com', NO_MX)]
+
+
+def test_null_mx_entry_beside_real_exchanger_is_ignored():
+    results = verifier({'fund.vc': ['', 'mx1.fund.vc']}).verify_batch(['partner@fund.vc'])
+    assert results[0][2] == VALID
+
+
+def test_cached_null_mx_from_an_earlier_run():
+    cache = DomainCache(path=None)
+    cache.set('nomail.com', [''])
+    resolver = StubResolver({})
+    results = EmailVerifier(resolver=resolver, cache=cache).verify_batch(['partner@nomail.com'])
+    assert results[0][2] == NO_MX
+    assert resolver.lookups == []